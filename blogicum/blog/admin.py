@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Location, Category, Post, Comment
+from .models import Location, Category, Post, Comment, ImageTask
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -52,3 +52,15 @@ class CommentAdmin(admin.ModelAdmin):
     list_editable = (
         'text',
     )
+
+
+@admin.register(ImageTask)
+class ImageTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'image_name',
+        'status',
+        'attempts',
+        'run_after',
+        'error',
+    )
+    list_filter = ('status',)
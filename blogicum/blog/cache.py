@@ -0,0 +1,58 @@
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import CommandError
+from django.dispatch import Signal
+from django.shortcuts import get_object_or_404
+
+VERSION_KEY = 'blog:{namespace}:version'
+
+cache_accessed = Signal()
+
+
+def is_cache_process_local():
+    return isinstance(caches['default'], LocMemCache)
+
+
+def require_shared_cache(command):
+    if is_cache_process_local():
+        raise CommandError(
+            f'{command} работает в отдельном процессе, и его сброс кэша'
+            ' не дойдёт до веб-процессов с LocMemCache: настройте общий'
+            ' кэш в CACHES.'
+        )
+
+
+def get_version(namespace):
+    return cache.get_or_set(
+        VERSION_KEY.format(namespace=namespace), time_ns, None
+    )
+
+
+def bump_version(namespace):
+    cache.set(VERSION_KEY.format(namespace=namespace), time_ns(), None)
+
+
+def make_key(namespace, *parts):
+    return ':'.join(
+        ('blog', namespace, str(get_version(namespace)), *map(str, parts))
+    )
+
+
+def get_cached(namespace, key):
+    value = cache.get(key)
+    cache_accessed.send(
+        sender=None, namespace=namespace, hit=value is not None
+    )
+    return value
+
+
+def get_cached_object_or_404(namespace, queryset, **lookup):
+    key = make_key(namespace, *lookup.values())
+    obj = get_cached(namespace, key)
+    if obj is None:
+        obj = get_object_or_404(queryset, **lookup)
+        cache.set(key, obj, settings.BLOG_LOOKUP_CACHE_TIMEOUT)
+    return obj
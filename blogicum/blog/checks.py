@@ -0,0 +1,18 @@
+from django.core.checks import Warning, register
+
+from .cache import is_cache_process_local
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    if not is_cache_process_local():
+        return []
+    return [Warning(
+        'Кэш по умолчанию — LocMemCache, у каждого процесса свой.',
+        hint=(
+            'Изменения из других воркеров, publish_scheduled'
+            ' и process_images не сбросят кэш лент и их ETag:'
+            ' настройте общий кэш (файловый, Redis или Memcached).'
+        ),
+        id='blog.W001',
+    )]
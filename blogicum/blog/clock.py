@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def publication_cutoff(now=None):
+    granularity = settings.BLOG_PUBLICATION_CLOCK_GRANULARITY
+    now = now or timezone.now()
+    tick = int(now.timestamp()) // granularity * granularity
+    return datetime.fromtimestamp(tick, tz=timezone.utc)
+
+
+def next_tick(now=None):
+    return publication_cutoff(now) + timedelta(
+        seconds=settings.BLOG_PUBLICATION_CLOCK_GRANULARITY
+    )
@@ -1,6 +1,34 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from PIL import Image
 
 from .models import Post, Comment, User
+from .uploads import RejectedUpload
+
+
+class DeferredImageField(forms.ImageField):
+    """Проверяет только заголовок файла, не декодируя изображение.
+
+    Полное декодирование и уменьшенные копии делает фоновый воркер
+    `manage.py process_images`.
+    """
+
+    def to_python(self, data):
+        if isinstance(data, RejectedUpload):
+            raise ValidationError(data.error, code='upload_rejected')
+        uploaded = forms.FileField.to_python(self, data)
+        if uploaded is None:
+            return None
+        try:
+            with Image.open(uploaded) as image:
+                uploaded.content_type = Image.MIME.get(image.format)
+        except Exception as error:
+            raise ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image'
+            ) from error
+        finally:
+            uploaded.seek(0)
+        return uploaded
 
 
 class ProfileForm(forms.ModelForm):
@@ -13,6 +41,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': DeferredImageField}
 
 
 class CommentForm(forms.ModelForm):
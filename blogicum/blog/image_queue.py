@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image
+
+from .cache import bump_version
+from .images import open_image, process_image
+from .models import ImageTask, Post
+
+# Ошибки декодирования: повтор не поможет, файл повреждён или не фото.
+DECODE_ERRORS = (
+    OSError, ValueError, SyntaxError, Image.DecompressionBombError,
+)
+CLAIM_CANDIDATES = 10
+
+
+def enqueue_image(post):
+    ImageTask.objects.filter(post=post).delete()
+    ImageTask.objects.create(post=post, image_name=post.image.name)
+
+
+def enqueue_missing_images():
+    enqueued = 0
+    posts = Post.objects.exclude(image='').only('image', 'image_variants')
+    for post in posts.iterator():
+        if (post.image_variants or {}).get('name') == post.image.name:
+            continue
+        enqueue_image(post)
+        Post.objects.filter(pk=post.pk).touch_cards(
+            image_variants={'name': post.image.name, 'pending': True}
+        )
+        enqueued += 1
+    if enqueued:
+        bump_version('page')
+    return enqueued
+
+
+def claim_task(now=None):
+    now = now or timezone.now()
+    candidates = ImageTask.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        status=ImageTask.PENDING,
+        run_after__lte=now,
+    )
+    lease = now + timedelta(seconds=settings.IMAGE_TASK_LEASE)
+    for task in candidates[:CLAIM_CANDIDATES]:
+        # Задачу забирает тот воркер, чей UPDATE застал прежнюю аренду.
+        claimed = ImageTask.objects.filter(
+            pk=task.pk, locked_until=task.locked_until
+        ).update(locked_until=lease)
+        if claimed:
+            task.locked_until = lease
+            return task
+    return None
+
+
+def save_variants(task, variants):
+    updated = Post.objects.filter(
+        pk=task.post_id, image=task.image_name
+    ).touch_cards(image=variants['name'], image_variants=variants)
+    if updated:
+        bump_version('page')
+    return updated
+
+
+def fail_task(task, error, permanent=False):
+    task.attempts += 1
+    task.error = repr(error)
+    task.locked_until = None
+    if permanent or task.attempts >= settings.IMAGE_TASK_MAX_ATTEMPTS:
+        task.status = ImageTask.FAILED
+        save_variants(task, {'name': task.image_name, 'sources': {}})
+    else:
+        task.run_after = timezone.now() + timedelta(
+            seconds=settings.IMAGE_TASK_RETRY_DELAY * 2 ** task.attempts
+        )
+    task.save()
+
+
+def run_task(task):
+    post = Post.objects.filter(
+        pk=task.post_id, image=task.image_name
+    ).first()
+    if post is None:
+        task.delete()
+        return
+    try:
+        picture = open_image(post.image)
+    except FileNotFoundError as error:
+        fail_task(task, error)
+        return
+    except DECODE_ERRORS as error:
+        fail_task(task, error, permanent=True)
+        return
+    try:
+        variants = process_image(post.image, picture)
+    except Exception as error:
+        fail_task(task, error)
+        return
+    # Если фото публикации успели заменить, копии останутся без ссылок
+    # и их удалит collect_images, как и прежний оригинал.
+    save_variants(task, variants)
+    task.delete()
+
+
+def process_image_tasks(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        task = claim_task()
+        if task is None:
+            break
+        run_task(task)
+        processed += 1
+    return processed
@@ -0,0 +1,136 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from pages.media import hashed_name, is_hashed_name, strip_hash
+
+# Формат Pillow, MIME-тип и расширение файла варианта.
+FORMATS = {
+    'avif': ('AVIF', 'image/avif', 'avif'),
+    'webp': ('WEBP', 'image/webp', 'webp'),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+}
+FALLBACK_FORMAT = 'jpeg'
+
+
+def get_formats():
+    Image.init()
+    return [
+        name for name in settings.POST_IMAGE_FORMATS
+        if FORMATS[name][0] in Image.SAVE
+    ]
+
+
+def get_pixels_error():
+    megapixels = settings.POST_IMAGE_MAX_PIXELS / 1_000_000
+    return f'Изображение больше {megapixels:g} мегапикселей.'
+
+
+def get_dimensions_error(size):
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    if max(size) > max_side:
+        return f'Изображение больше {max_side} пикселей по стороне.'
+    if size[0] * size[1] > settings.POST_IMAGE_MAX_PIXELS:
+        return get_pixels_error()
+    return None
+
+
+def open_image(image):
+    with image.open('rb'):
+        picture = Image.open(image)
+        error = get_dimensions_error(picture.size)
+        if error:
+            raise Image.DecompressionBombError(error)
+        picture.load()
+    return picture
+
+
+def has_metadata(picture):
+    return bool(
+        picture.getexif() or picture.info.get('exif')
+        or picture.info.get('xmp')
+    )
+
+
+def save_hashed(storage, name, content):
+    return storage.save(hashed_name(name, content), ContentFile(content))
+
+
+def save_clean_original(picture, storage, name):
+    buffer = BytesIO()
+    options = {'icc_profile': picture.info.get('icc_profile'), 'exif': b''}
+    if picture.format == 'JPEG':
+        options['quality'] = 95
+    ImageOps.exif_transpose(picture).save(buffer, picture.format, **options)
+    return save_hashed(storage, name, buffer.getvalue())
+
+
+def save_hashed_original(image):
+    with image.open('rb'):
+        content = image.read()
+    return save_hashed(image.storage, image.name, content)
+
+
+def save_variant(picture, width, storage, stem, format_name):
+    pil_format, _, extension = FORMATS[format_name]
+    height = round(picture.height * width / picture.width)
+    resized = picture.resize((width, height), Image.Resampling.LANCZOS)
+    if pil_format == 'JPEG' and resized.mode != 'RGB':
+        resized = resized.convert('RGB')
+    buffer = BytesIO()
+    resized.save(
+        buffer, pil_format, quality=settings.POST_IMAGE_QUALITY,
+        optimize=pil_format == 'JPEG', exif=b'',
+    )
+    return save_hashed(
+        storage, f'{stem}_{width}w.{extension}', buffer.getvalue()
+    )
+
+
+def process_image(image, picture):
+    """Сохраняет уменьшенные копии декодированного фото рядом с оригиналом.
+
+    Все файлы получают в имени хэш содержимого, чтобы их можно было
+    кэшировать навсегда. Если в оригинале есть EXIF или XMP, он
+    пересохраняется без них и с учётом ориентации, иначе копируется
+    под хэшированным именем. Возвращает описание для
+    `Post.image_variants`: имя оригинала, его размеры и списки
+    `[ширина, имя файла]` по MIME-типам.
+    """
+    name = image.name
+    if has_metadata(picture):
+        name = save_clean_original(
+            picture, image.storage, strip_hash(name)
+        )
+    elif not is_hashed_name(name):
+        name = save_hashed_original(image)
+    picture = ImageOps.exif_transpose(picture)
+    widths = sorted({
+        min(width, picture.width) for width in settings.POST_IMAGE_WIDTHS
+    })
+    stem = PurePosixPath(strip_hash(name)).with_suffix('')
+    return {
+        'name': name,
+        'width': picture.width,
+        'height': picture.height,
+        'sources': {
+            FORMATS[format_name][1]: [
+                [width, save_variant(
+                    picture, width, image.storage, stem, format_name
+                )]
+                for width in widths
+            ]
+            for format_name in get_formats()
+        },
+    }
+
+
+def get_variant_names(variants):
+    if variants.get('name'):
+        yield variants['name']
+    for sources in variants.get('sources', {}).values():
+        for _, name in sources:
+            yield name
@@ -0,0 +1,321 @@
+import asyncio
+import random
+import re
+from collections import Counter, defaultdict
+from time import monotonic
+from urllib.parse import urlencode
+
+from pages.instrumentation import percentile
+
+CSRF_TOKEN = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+DEFAULT_MIX = {'feed': 60, 'detail': 30, 'login': 3, 'comment': 7}
+NO_BODY_STATUSES = (204, 304)
+
+
+class LoadTestError(Exception):
+    pass
+
+
+class Response:
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Connection:
+    """Keep-alive соединение HTTP/1.1 с cookie одного посетителя."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = self.writer = None
+        self.cookies = {}
+
+    async def request(self, method, path, data=None):
+        try:
+            return await asyncio.wait_for(
+                self.send(method, path, data), self.timeout
+            )
+        except BaseException:
+            self.close()
+            raise
+
+    async def send(self, method, path, data):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Connection: keep-alive',
+        ]
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            ))
+        body = b''
+        if data is not None:
+            body = urlencode(data).encode()
+            lines.append('Content-Type: application/x-www-form-urlencoded')
+            lines.append(f'Content-Length: {len(body)}')
+        head = '\r\n'.join(lines) + '\r\n\r\n'
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+        response = await self.read_response()
+        if response.headers.get('connection', '').lower() == 'close':
+            self.close()
+        return response
+
+    async def read_response(self):
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status_line, *lines = head.decode('latin-1').split('\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        for line in filter(None, lines):
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                self.set_cookie(value)
+            headers[name] = value
+        if status in NO_BODY_STATUSES:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self.read_chunked()
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(
+                int(headers['content-length'])
+            )
+        else:
+            body = await self.reader.read()
+            self.close()
+        return Response(status, headers, body)
+
+    async def read_chunked(self):
+        chunks = []
+        while True:
+            line = await self.reader.readline()
+            size = int(line.split(b';')[0], 16)
+            if not size:
+                while await self.reader.readline() not in (b'\r\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def set_cookie(self, header):
+        name, _, value = header.split(';')[0].partition('=')
+        if not value or 'max-age=0' in header.lower():
+            self.cookies.pop(name.strip(), None)
+        else:
+            self.cookies[name.strip()] = value.strip()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def expect(response, *statuses):
+    if response.status not in statuses:
+        raise LoadTestError(f'HTTP {response.status}')
+    return response
+
+
+def csrf_token(response):
+    match = CSRF_TOKEN.search(response.body)
+    if match is None:
+        raise LoadTestError('нет csrf-токена')
+    return match.group(1).decode()
+
+
+class Stats:
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.http_requests = 0
+        self.bytes = 0
+
+    def record(self, scenario, latency, error=None):
+        self.latencies[scenario].append(latency)
+        if error is not None:
+            self.errors[scenario][error] += 1
+
+    def report(self, elapsed):
+        scenarios = {}
+        total = failed = 0
+        for name, latencies in sorted(self.latencies.items()):
+            errors = sum(self.errors[name].values())
+            total += len(latencies)
+            failed += errors
+            scenarios[name] = {
+                'count': len(latencies),
+                'errors': dict(self.errors[name]),
+                'error_rate': errors / len(latencies),
+                'p50_ms': percentile(latencies, 0.5) * 1000,
+                'p95_ms': percentile(latencies, 0.95) * 1000,
+                'p99_ms': percentile(latencies, 0.99) * 1000,
+            }
+        return {
+            'elapsed_s': elapsed,
+            'scenarios_total': total,
+            'throughput_rps': total / elapsed,
+            'http_requests': self.http_requests,
+            'http_rps': self.http_requests / elapsed,
+            'bytes': self.bytes,
+            'error_rate': failed / total if total else 0,
+            'scenarios': scenarios,
+        }
+
+
+class LoadTest:
+    """Открытая модель нагрузки: сценарии стартуют с частотой `rps`.
+
+    Задержка сценария считается от запланированного момента старта,
+    поэтому ожидание свободного слота (`concurrency`) тоже попадает
+    в перцентили и медленный сервер не «замедляет» генератор.
+    """
+
+    def __init__(self, host, port, targets, usernames, password, rps,
+                 duration, mix=None, concurrency=100, timeout=10.0,
+                 seed=None):
+        self.host = host
+        self.port = port
+        self.targets = targets
+        self.usernames = usernames
+        self.password = password
+        self.rps = rps
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self.stats = Stats()
+        self.connections = []
+
+    def connect(self):
+        connection = Connection(self.host, self.port, self.timeout)
+        self.connections.append(connection)
+        return connection
+
+    async def fetch(self, connection, method, path, data=None):
+        response = await connection.request(method, path, data)
+        self.stats.http_requests += 1
+        self.stats.bytes += len(response.body)
+        return response
+
+    async def login(self, connection, username):
+        connection.cookies.clear()
+        page = expect(
+            await self.fetch(connection, 'GET', '/auth/login/'), 200
+        )
+        expect(await self.fetch(connection, 'POST', '/auth/login/', {
+            'csrfmiddlewaretoken': csrf_token(page),
+            'username': username,
+            'password': self.password,
+        }), 302)
+
+    def choose_feed_path(self):
+        kind = self.random.choice(('index', 'page', 'category', 'profile'))
+        if kind == 'page':
+            return f'/?page={self.random.randint(2, 5)}'
+        if kind == 'category' and self.targets['categories']:
+            slug = self.random.choice(self.targets['categories'])
+            return f'/category/{slug}/'
+        if kind == 'profile' and self.targets['authors']:
+            username = self.random.choice(self.targets['authors'])
+            return f'/profile/{username}/'
+        return '/'
+
+    def choose_post(self):
+        return self.random.choice(self.targets['posts'])
+
+    async def get_anonymous(self, path):
+        connection = (
+            self.connect() if self.anonymous.empty()
+            else self.anonymous.get_nowait()
+        )
+        try:
+            expect(await self.fetch(connection, 'GET', path), 200)
+        finally:
+            self.anonymous.put_nowait(connection)
+
+    async def scenario_feed(self):
+        await self.get_anonymous(self.choose_feed_path())
+
+    async def scenario_detail(self):
+        await self.get_anonymous(f'/posts/{self.choose_post()}/')
+
+    async def scenario_login(self):
+        username, connection = await self.accounts.get()
+        try:
+            await self.login(connection, username)
+        finally:
+            self.accounts.put_nowait((username, connection))
+
+    async def scenario_comment(self):
+        username, connection = await self.accounts.get()
+        try:
+            post = self.choose_post()
+            page = expect(await self.fetch(
+                connection, 'GET', f'/posts/{post}/'), 200)
+            expect(await self.fetch(
+                connection, 'POST', f'/posts/{post}/comment/', {
+                    'csrfmiddlewaretoken': csrf_token(page),
+                    'text': f'Комментарий нагрузочного теста {username}.',
+                }), 302)
+        finally:
+            self.accounts.put_nowait((username, connection))
+
+    async def run_scenario(self, name, scheduled, slots):
+        error = None
+        async with slots:
+            try:
+                await getattr(self, f'scenario_{name}')()
+            except LoadTestError as exception:
+                error = str(exception)
+            except asyncio.TimeoutError:
+                error = 'timeout'
+            except (OSError, asyncio.IncompleteReadError) as exception:
+                error = type(exception).__name__
+        self.stats.record(name, monotonic() - scheduled, error)
+
+    async def prepare(self):
+        self.anonymous = asyncio.Queue()
+        self.accounts = asyncio.Queue()
+        for username in self.usernames:
+            connection = self.connect()
+            await self.login(connection, username)
+            self.accounts.put_nowait((username, connection))
+
+    async def run(self):
+        await self.prepare()
+        self.stats = Stats()
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        if not self.usernames:
+            weights = [
+                0 if name in ('login', 'comment') else weight
+                for name, weight in zip(names, weights)
+            ]
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        start = monotonic()
+        for number in range(int(self.rps * self.duration)):
+            scheduled = start + number / self.rps
+            delay = scheduled - monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = self.random.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(
+                self.run_scenario(name, scheduled, slots)
+            ))
+        await asyncio.gather(*tasks)
+        report = self.stats.report(monotonic() - start)
+        for connection in self.connections:
+            connection.close()
+        return report
@@ -0,0 +1,203 @@
+import json
+from http import HTTPStatus
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Post, User
+from pages.instrumentation import QueryCollector, percentile
+
+METRICS = ('p50_ms', 'p95_ms', 'queries', 'bytes')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95), число запросов к БД и объём ответа'
+        ' лент, страницы публикации, добавления комментария и публикации,'
+        ' сохраняет результат в JSON и сравнивает его с базовым.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Сколько замеряемых запросов выполнить в каждом сценарии.'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Сколько запросов выполнить до замеров.'
+        )
+        parser.add_argument('--output', help='Файл для результата в JSON.')
+        parser.add_argument(
+            '--baseline', help='Файл с базовым результатом для сравнения.'
+        )
+        parser.add_argument(
+            '--threshold', type=float,
+            help='Допустимый рост задержки относительно базового результата,'
+                 ' доля; по умолчанию из BENCHMARK_THRESHOLDS.'
+        )
+        parser.add_argument(
+            '--page-cache', action='store_true',
+            help='Не отключать кэш страниц для анонимных посетителей.'
+        )
+        parser.add_argument('--host', default='localhost')
+
+    def handle(self, *args, **options):
+        self.options = options
+        overrides = {} if options['page_cache'] else {
+            'BLOG_PAGE_CACHE_TIMEOUT': 0
+        }
+        with override_settings(**overrides):
+            try:
+                # Добавленные публикации и комментарии откатываются, чтобы
+                # повторные прогоны шли на одних и тех же данных.
+                with transaction.atomic():
+                    results = self.run_scenarios()
+                    raise Rollback
+            except Rollback:
+                pass
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'posts': Post.objects.count(),
+            'requests': options['requests'],
+            'scenarios': results,
+        }
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<14} p50 {result["p50_ms"]:8.2f} мс'
+                f'  p95 {result["p95_ms"]:8.2f} мс'
+                f'  запросов {result["queries"]:5.1f}'
+                f'  байт {result["bytes"]:8.0f}'
+            )
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(report, ensure_ascii=False, indent=2)
+            )
+        if options['baseline']:
+            self.compare(report, options['baseline'])
+
+    def get_scenarios(self):
+        post = (
+            Post.objects.published().order_by('-comment_count', '-pk')
+            .select_related('author', 'category').first()
+        )
+        if post is None:
+            raise CommandError(
+                'Нет опубликованных записей: заполните базу командой'
+                ' seed_blog.'
+            )
+        category = (
+            Category.objects.filter(is_published=True)
+            .annotate(total=Count('posts')).order_by('-total').first()
+        )
+        author = (
+            User.objects.annotate(total=Count('posts'))
+            .order_by('-total').first()
+        )
+        user, _ = User.objects.get_or_create(username='benchmark')
+        anonymous = Client(HTTP_HOST=self.options['host'])
+        logged_in = Client(HTTP_HOST=self.options['host'])
+        logged_in.force_login(user)
+        pub_date = timezone.localtime().strftime('%Y-%m-%d %H:%M')
+        return {
+            'index': (anonymous.get, reverse('blog:index'), None),
+            'category': (anonymous.get, reverse(
+                'blog:category_posts', args=[category.slug]), None),
+            'profile': (anonymous.get, reverse(
+                'blog:profile', args=[author.username]), None),
+            'post_detail': (anonymous.get, reverse(
+                'blog:post_detail', args=[post.pk]), None),
+            'add_comment': (logged_in.post, reverse(
+                'blog:add_comment', args=[post.pk]),
+                {'text': 'Комментарий для замера.'}),
+            'create_post': (logged_in.post, reverse('blog:create_post'), {
+                'title': 'Публикация для замера',
+                'text': 'Текст публикации для замера.',
+                'pub_date': pub_date,
+                'category': post.category_id,
+                'is_published': 'on',
+            }),
+        }
+
+    def run_scenarios(self):
+        return {
+            name: self.measure(name, method, url, data)
+            for name, (method, url, data) in self.get_scenarios().items()
+        }
+
+    def request(self, name, method, url, data):
+        collector = QueryCollector()
+        with collector.collect():
+            start = perf_counter()
+            response = method(url, data) if data else method(url)
+            duration = perf_counter() - start
+        if response.status_code not in (HTTPStatus.OK, HTTPStatus.FOUND):
+            raise CommandError(
+                f'{name}: {url} вернул {response.status_code}.'
+            )
+        return duration, collector.count, len(response.content)
+
+    def measure(self, name, method, url, data):
+        for _ in range(self.options['warmup']):
+            self.request(name, method, url, data)
+        durations, queries, sizes = [], [], []
+        for _ in range(self.options['requests']):
+            duration, count, size = self.request(name, method, url, data)
+            durations.append(duration * 1000)
+            queries.append(count)
+            sizes.append(size)
+        return {
+            'url': url,
+            'p50_ms': round(percentile(durations, 0.5), 3),
+            'p95_ms': round(percentile(durations, 0.95), 3),
+            'queries': sum(queries) / len(queries),
+            'bytes': sum(sizes) / len(sizes),
+        }
+
+    def get_thresholds(self):
+        thresholds = dict(settings.BENCHMARK_THRESHOLDS)
+        if self.options['threshold'] is not None:
+            thresholds['p50_ms'] = self.options['threshold']
+            thresholds['p95_ms'] = self.options['threshold']
+        return thresholds
+
+    def compare(self, report, baseline_path):
+        try:
+            baseline = json.loads(Path(baseline_path).read_text())
+        except (OSError, ValueError) as error:
+            raise CommandError(
+                f'Не удалось прочитать {baseline_path}: {error}'
+            )
+        thresholds = self.get_thresholds()
+        regressions = []
+        for name, result in report['scenarios'].items():
+            base = baseline.get('scenarios', {}).get(name)
+            if base is None:
+                continue
+            for metric in METRICS:
+                limit = base[metric] * (1 + thresholds[metric])
+                if result[metric] > limit:
+                    regressions.append(
+                        f'{name} {metric}: {result[metric]:.2f}'
+                        f' > {base[metric]:.2f}'
+                        f' ({thresholds[metric]:+.0%})'
+                    )
+        if regressions:
+            raise CommandError(
+                'Регрессия относительно базового результата:\n'
+                + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Регрессий относительно базового результата нет.'
+        ))
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from pathlib import PurePosixPath
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from blog.images import get_variant_names
+from blog.models import ImageTask, Post
+
+
+def iter_stored_names(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield str(PurePosixPath(directory, name))
+    for name in directories:
+        yield from iter_stored_names(
+            storage, str(PurePosixPath(directory, name))
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы фото и их копий, на которые не ссылается ни одна'
+        ' публикация и ни одна задача обработки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций читать из БД за один запрос.'
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Не удалять файлы моложе этого числа секунд: они могут'
+                 ' принадлежать ещё не сохранённой публикации.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, сколько файлов будет удалено.'
+        )
+
+    def get_references(self, batch_size):
+        references = set()
+        posts = Post.objects.exclude(image='').values_list(
+            'image', 'image_variants'
+        )
+        for image, variants in posts.iterator(chunk_size=batch_size):
+            references.add(image)
+            references.update(get_variant_names(variants or {}))
+        references.update(
+            ImageTask.objects.values_list('image_name', flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+        return references
+
+    def handle(self, *args, batch_size, min_age, dry_run, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        if not storage.exists(field.upload_to):
+            return
+        # Файлы, записанные после этой отметки, не трогаем: ссылки
+        # на них могли появиться после чтения ссылок из БД.
+        cutoff = timezone.now() - timedelta(seconds=min_age)
+        references = self.get_references(batch_size)
+        deleted = freed = 0
+        for name in iter_stored_names(storage, field.upload_to):
+            if name in references:
+                continue
+            if storage.get_modified_time(name) > cutoff:
+                continue
+            freed += storage.size(name)
+            deleted += 1
+            if not dry_run:
+                storage.delete(name)
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(
+            f'{verb} файлов: {deleted} ({filesizeformat(freed)})'
+        )
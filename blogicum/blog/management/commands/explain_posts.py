@@ -0,0 +1,53 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Category, Post, User
+from blog.views import POSTS_ON_PAGE
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит планы выполнения (EXPLAIN) и время запросов'
+        ' первой страницы ленты, категории и профиля.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument('--username', help='Имя автора.')
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз выполнить каждый запрос для замера времени.'
+        )
+
+    def get_querysets(self, category_slug, username):
+        category = Category.objects.filter(is_published=True)
+        if category_slug:
+            category = category.filter(slug=category_slug)
+        author = User.objects.all()
+        if username:
+            author = author.filter(username=username)
+        category, author = category.first(), author.first()
+        if category is None or author is None:
+            raise CommandError('Нет категории или автора для проверки.')
+        return {
+            'index': Post.objects.published().card(),
+            f'category {category.slug}': (
+                category.posts.published().card()),
+            f'profile {author.username}': author.posts.published().card(),
+        }
+
+    def handle(self, *args, category, username, repeat, **options):
+        querysets = self.get_querysets(category, username)
+        for name, queryset in querysets.items():
+            page = queryset[:POSTS_ON_PAGE]
+            timings = []
+            for _ in range(repeat):
+                start = perf_counter()
+                list(page.all())
+                timings.append(perf_counter() - start)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(page.explain())
+            self.stdout.write(
+                f'лучшее время: {min(timings) * 1000:.2f} мс\n'
+            )
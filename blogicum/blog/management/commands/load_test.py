@@ -0,0 +1,232 @@
+import asyncio
+import json
+import secrets
+import shlex
+import socket
+import subprocess
+import sys
+from contextlib import contextmanager
+from importlib.util import find_spec
+from pathlib import Path
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.loadtest import DEFAULT_MIX, LoadTest
+from blog.models import Category, Post, User
+
+USERNAME_PREFIX = 'loadtest_'
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in DEFAULT_MIX or not weight.strip().isdigit():
+            raise CommandError(
+                f'Некорректный сценарий «{item}»; доступны:'
+                f' {", ".join(DEFAULT_MIX)}.'
+            )
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает сервер (WSGI или ASGI) и нагружает его смесью просмотров'
+        ' лент и публикаций, входов и комментариев с заданной частотой;'
+        ' выводит пропускную способность, перцентили задержки и долю'
+        ' ошибок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--server', choices=('wsgi', 'asgi'), default='wsgi',
+            help='wsgi — runserver с blogicum.wsgi, asgi — uvicorn'
+                 ' с blogicum.asgi.'
+        )
+        parser.add_argument(
+            '--server-command',
+            help='Своя команда запуска сервера с подстановками {host}'
+                 ' и {port}, например «gunicorn -w 4 -b {host}:{port}'
+                 ' blogicum.wsgi».'
+        )
+        parser.add_argument(
+            '--url', help='Адрес уже запущенного сервера; свой не запускать.'
+        )
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=0)
+        parser.add_argument(
+            '--rps', type=float, default=50,
+            help='Сколько сценариев запускать в секунду.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность нагрузки, секунды.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Предел одновременно выполняемых сценариев.'
+        )
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument(
+            '--users', type=int, default=10,
+            help='Сколько временных пользователей входят и комментируют.'
+        )
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help='Веса сценариев, например «feed=60,detail=30,login=3,'
+                 'comment=7».'
+        )
+        parser.add_argument('--startup-timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--output', help='Файл для результата в JSON.')
+
+    def get_targets(self):
+        posts = list(
+            Post.objects.published().order_by('-pub_date')
+            .values_list('pk', flat=True)[:500]
+        )
+        if not posts:
+            raise CommandError(
+                'Нет опубликованных записей: заполните базу командой'
+                ' seed_blog.'
+            )
+        return {
+            'posts': posts,
+            'categories': list(
+                Category.objects.filter(is_published=True)
+                .values_list('slug', flat=True)[:50]
+            ),
+            'authors': list(
+                User.objects.filter(posts__is_visible=True).distinct()
+                .values_list('username', flat=True)[:100]
+            ),
+        }
+
+    def create_users(self, count, password):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        return [
+            User.objects.create_user(
+                f'{USERNAME_PREFIX}{number}', password=password
+            ).username
+            for number in range(count)
+        ]
+
+    def get_server_args(self, host, port):
+        if self.options['server_command']:
+            return shlex.split(self.options['server_command'].format(
+                host=host, port=port
+            ))
+        if self.options['server'] == 'asgi':
+            if find_spec('uvicorn') is None:
+                raise CommandError(
+                    'Для --server asgi установите uvicorn или укажите'
+                    ' --server-command.'
+                )
+            return [
+                sys.executable, '-m', 'uvicorn', 'blogicum.asgi:application',
+                '--host', host, '--port', str(port), '--no-access-log',
+            ]
+        return [
+            sys.executable, 'manage.py', 'runserver', '--noreload',
+            f'{host}:{port}',
+        ]
+
+    @contextmanager
+    def server(self, host, port):
+        args = self.get_server_args(host, port)
+        process = subprocess.Popen(
+            args, cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_for_server(process, host, port)
+            yield ' '.join(args)
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def wait_for_server(self, process, host, port):
+        deadline = monotonic() + self.options['startup_timeout']
+        while monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(
+                    f'Сервер завершился с кодом {process.returncode}.'
+                )
+            try:
+                socket.create_connection((host, port), timeout=0.5).close()
+                return
+            except OSError:
+                sleep(0.1)
+        raise CommandError('Сервер не начал принимать соединения.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        targets = self.get_targets()
+        password = secrets.token_urlsafe()
+        usernames = self.create_users(options['users'], password)
+        try:
+            if options['url']:
+                url = urlsplit(options['url'])
+                report = self.run_load(
+                    url.hostname, url.port or 80, targets, usernames,
+                    password, options['url'],
+                )
+            else:
+                host = options['host']
+                port = options['port'] or free_port(host)
+                with self.server(host, port) as server:
+                    report = self.run_load(
+                        host, port, targets, usernames, password, server
+                    )
+        finally:
+            # Вместе с пользователями удаляются и их комментарии.
+            User.objects.filter(
+                username__startswith=USERNAME_PREFIX
+            ).delete()
+        self.print_report(report)
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(report, ensure_ascii=False, indent=2)
+            )
+
+    def run_load(self, host, port, targets, usernames, password, server):
+        options = self.options
+        report = asyncio.run(LoadTest(
+            host, port, targets, usernames, password,
+            rps=options['rps'], duration=options['duration'],
+            mix=options['mix'], concurrency=options['concurrency'],
+            timeout=options['timeout'], seed=options['seed'],
+        ).run())
+        report.update(server=server, target_rps=options['rps'])
+        return report
+
+    def print_report(self, report):
+        self.stdout.write(self.style.MIGRATE_HEADING(report['server']))
+        for name, result in report['scenarios'].items():
+            self.stdout.write(
+                f'{name:<8} {result["count"]:6d}'
+                f'  p50 {result["p50_ms"]:8.1f} мс'
+                f'  p95 {result["p95_ms"]:8.1f} мс'
+                f'  p99 {result["p99_ms"]:8.1f} мс'
+                f'  ошибок {result["error_rate"]:6.1%}'
+                + (f'  {result["errors"]}' if result['errors'] else '')
+            )
+        self.stdout.write(
+            f'сценариев в секунду: {report["throughput_rps"]:.1f}'
+            f' (цель {report["target_rps"]:g}),'
+            f' HTTP-запросов в секунду: {report["http_rps"]:.1f},'
+            f' ошибок: {report["error_rate"]:.1%}'
+        )
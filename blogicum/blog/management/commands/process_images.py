@@ -0,0 +1,49 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from blog.cache import require_shared_cache
+from blog.image_queue import enqueue_missing_images, process_image_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает загруженные фото публикаций: декодирует, убирает'
+        ' EXIF, поворачивает и готовит уменьшенные копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, ожидая новые задачи.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза между проверками очереди, секунды.'
+        )
+        parser.add_argument(
+            '--enqueue-missing', action='store_true',
+            help='Поставить в очередь фото публикаций без готовых копий.'
+        )
+        parser.add_argument(
+            '--limit', type=int,
+            help='Сколько задач обработать за одну проверку.'
+        )
+
+    def process(self, limit):
+        processed = process_image_tasks(limit)
+        if processed:
+            self.stdout.write(f'Обработано фото: {processed}')
+        return processed
+
+    def handle(self, *args, loop, interval, limit, enqueue_missing,
+               **options):
+        require_shared_cache('process_images')
+        if enqueue_missing:
+            self.stdout.write(
+                f'Поставлено в очередь: {enqueue_missing_images()}'
+            )
+        self.process(limit)
+        while loop:
+            if not self.process(limit):
+                sleep(interval)
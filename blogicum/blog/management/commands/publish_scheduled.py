@@ -0,0 +1,33 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import require_shared_cache
+from blog.clock import next_tick
+from blog.publication import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает для читателей отложенные публикации, время которых'
+        ' наступило, и сбрасывает кэш лент.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя публикации каждый такт часов.'
+        )
+
+    def publish(self):
+        published = publish_due_posts()
+        if published:
+            self.stdout.write(f'Опубликовано записей: {published}')
+
+    def handle(self, *args, loop, **options):
+        require_shared_cache('publish_scheduled')
+        self.publish()
+        while loop:
+            sleep((next_tick() - timezone.now()).total_seconds())
+            self.publish()
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.cache import bump_version
+from blog.models import Comment, Post
+
+BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество публикаций, обновляемых одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        actual_count = Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk')).order_by()
+                .values('post').annotate(total=Count('pk')).values('total')
+            ),
+            0,
+        )
+        posts = Post.objects.order_by('pk').values_list('pk', flat=True)
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not pks:
+                break
+            # Карточки с исправленным счётчиком получают новую версию,
+            # иначе закэшированный фрагмент показывал бы старое число.
+            updated += Post.objects.filter(
+                pk__gte=pks[0], pk__lte=pks[-1]
+            ).exclude(
+                comment_count=actual_count
+            ).touch_cards(comment_count=actual_count)
+            last_pk = pks[-1]
+        if updated:
+            bump_version('page')
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {updated}')
+        )
@@ -0,0 +1,219 @@
+import random
+from array import array
+from datetime import timedelta
+from time import perf_counter, time_ns
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+BATCH_SIZE = 5000
+WORDS = (
+    'город море горы лес река путешествие утро вечер дорога поезд самолёт'
+    ' кофе книга музыка друзья праздник зима лето осень весна солнце дождь'
+    ' снег прогулка фото рецепт ужин завтрак работа отпуск выходные парк'
+    ' музей выставка концерт история заметка мысли планы итоги неделя'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями,'
+        ' местоположениями, публикациями и комментариями для нагрузочного'
+        ' тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=500_000)
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='За сколько дней в прошлое распределены публикации.'
+        )
+        parser.add_argument(
+            '--future-share', type=float, default=0.02,
+            help='Доля отложенных публикаций с датой в будущем.'
+        )
+        parser.add_argument(
+            '--unpublished-share', type=float, default=0.05,
+            help='Доля публикаций, категорий и мест, снятых с публикации.'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковые параметры дают одни данные.'
+        )
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс имён пользователей и slug категорий.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f'Данные с префиксом «{prefix}» уже есть; укажите --prefix.'
+            )
+        start = perf_counter()
+        users = self.create_users(prefix)
+        categories = self.create_categories(prefix)
+        locations = self.create_locations()
+        posts = self.create_posts(users, categories, locations)
+        self.create_comments(users, posts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {perf_counter() - start:.1f} с.'
+        ))
+
+    def is_unpublished(self):
+        return self.random.random() < self.options['unpublished_share']
+
+    def words(self, count):
+        return ' '.join(self.random.choices(WORDS, k=count))
+
+    def bulk_create(self, model, objects):
+        batch = []
+        created = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                created += self.insert(model, batch)
+                batch = []
+        if batch:
+            created += self.insert(model, batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {created}')
+
+    def insert(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
+
+    def new_pks(self, model, last_pk):
+        return array('q', model.objects.filter(
+            pk__gt=last_pk
+        ).order_by('pk').values_list('pk', flat=True).iterator())
+
+    def last_pk(self, model):
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        return last.first() or 0
+
+    def create_users(self, prefix):
+        last_pk = self.last_pk(User)
+        password = make_password(None)
+        self.bulk_create(User, (
+            User(
+                username=f'{prefix}_{number}',
+                first_name=self.words(1).title(),
+                password=password,
+                date_joined=self.now - timedelta(
+                    days=self.random.uniform(0, self.options['days'])),
+            )
+            for number in range(self.options['users'])
+        ))
+        return self.new_pks(User, last_pk)
+
+    def create_categories(self, prefix):
+        last_pk = self.last_pk(Category)
+        self.bulk_create(Category, (
+            Category(
+                title=self.words(2).capitalize(),
+                description=self.words(20),
+                slug=f'{prefix}-{number}',
+                is_published=not self.is_unpublished(),
+            )
+            for number in range(self.options['categories'])
+        ))
+        return dict(Category.objects.filter(
+            pk__gt=last_pk).values_list('pk', 'is_published'))
+
+    def create_locations(self):
+        last_pk = self.last_pk(Location)
+        self.bulk_create(Location, (
+            Location(
+                name=self.words(2).title(),
+                is_published=not self.is_unpublished(),
+            )
+            for _ in range(self.options['locations'])
+        ))
+        return self.new_pks(Location, last_pk)
+
+    def pub_date(self):
+        if self.random.random() < self.options['future_share']:
+            return self.now + timedelta(days=self.random.uniform(0, 30))
+        # Больше свежих публикаций, чем старых.
+        age = self.options['days'] * self.random.random() ** 2
+        return self.now - timedelta(days=age)
+
+    def build_post(self, users, category_pks, categories, locations):
+        category_pk = self.random.choice(category_pks)
+        pub_date = self.pub_date()
+        is_published = not self.is_unpublished()
+        return Post(
+            title=self.words(self.random.randint(2, 6)).capitalize(),
+            text=self.words(self.random.randint(20, 300)),
+            pub_date=pub_date,
+            is_published=is_published,
+            author_id=self.random.choice(users),
+            category_id=category_pk,
+            location_id=(
+                self.random.choice(locations)
+                if locations and self.random.random() < 0.7 else None
+            ),
+            is_visible=(
+                is_published and pub_date <= self.now
+                and categories[category_pk]
+            ),
+            card_version=time_ns(),
+        )
+
+    def create_posts(self, users, categories, locations):
+        if not users or not categories:
+            raise CommandError('Нужен хотя бы один автор и одна категория.')
+        last_pk = self.last_pk(Post)
+        category_pks = sorted(categories)
+        self.bulk_create(Post, (
+            self.build_post(users, category_pks, categories, locations)
+            for _ in range(self.options['posts'])
+        ))
+        return self.new_pks(Post, last_pk)
+
+    def create_comments(self, users, posts):
+        if not posts:
+            return
+        counts = array('l', [0]) * len(posts)
+
+        def build_comment():
+            # Комментарии сосредоточены на небольшой доле публикаций.
+            index = int(len(posts) * self.random.random() ** 3)
+            counts[index] += 1
+            return Comment(
+                post_id=posts[index],
+                author_id=self.random.choice(users),
+                text=self.words(self.random.randint(3, 40)),
+            )
+
+        self.bulk_create(Comment, (
+            build_comment() for _ in range(self.options['comments'])
+        ))
+        self.update_comment_counts(posts, counts)
+
+    def update_comment_counts(self, posts, counts):
+        by_count = {}
+        for pk, count in zip(posts, counts):
+            if count:
+                by_count.setdefault(count, []).append(pk)
+        with transaction.atomic():
+            for count, pks in by_count.items():
+                for start in range(0, len(pks), self.batch_size):
+                    Post.objects.filter(
+                        pk__in=pks[start:start + self.batch_size]
+                    ).update(comment_count=count)
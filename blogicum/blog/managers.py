@@ -1,23 +1,66 @@
+from time import time_ns
+
 from django.db import models
-from django.db.models import Count
+from django.db.models import ExpressionWrapper, Min, Q
 from django.utils import timezone
 
+POST_CARD_FIELDS = (
+    'title',
+    'text',
+    'pub_date',
+    'image',
+    'image_variants',
+    'is_published',
+    'comment_count',
+    'card_version',
+    'updated_at',
+    'author__username',
+    'location__name',
+    'location__is_published',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+)
+
 
 class PostQuerySet(models.QuerySet):
 
     def published(self):
+        return self.filter(is_visible=True)
+
+    def next_publication(self):
         return self.filter(
-            is_published=True,
-            pub_date__lte=timezone.now(),
-            category__is_published=True
-        )
+            is_published=True, pub_date__gt=timezone.now()
+        ).aggregate(next_publication=Min('pub_date'))['next_publication']
+
+    def with_related(self):
+        return self.select_related('author', 'location', 'category')
 
-    def comment_count(self):
-        return self.annotate(
-            comment_count=Count('comments')
+    def card(self):
+        return self.with_related().only(
+            *POST_CARD_FIELDS
         ).order_by('-pub_date')
 
-    def modify_related_query(self):
-        return self.select_related(
-            'author', 'location', 'category'
-        ).prefetch_related('comments')
+    def detail(self):
+        return self.with_related()
+
+    def touch_cards(self, **kwargs):
+        return self.update(
+            card_version=time_ns(), updated_at=timezone.now(), **kwargs
+        )
+
+    def refresh_visibility(self, category_is_published=True):
+        if not category_is_published:
+            return self.touch_cards(is_visible=False)
+        return self.touch_cards(is_visible=ExpressionWrapper(
+            Q(is_published=True, pub_date__lte=timezone.now()),
+            output_field=models.BooleanField(),
+        ))
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def with_author(self):
+        return self.select_related('author').only(
+            'text', 'created_at', 'post', 'author__username'
+        )
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+from .clock import publication_cutoff
+from .publication import publish_due_posts_once_per_tick
+
+
+class PublicationClockMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.last_tick = None
+
+    def __call__(self, request):
+        if settings.BLOG_PUBLICATION_INLINE_SCHEDULER:
+            tick = publication_cutoff()
+            if tick != self.last_tick:
+                self.last_tick = tick
+                publish_due_posts_once_per_tick()
+        return self.get_response(request)
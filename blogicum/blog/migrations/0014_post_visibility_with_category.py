@@ -0,0 +1,47 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:31
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def hide_posts_without_published_category(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        Q(category__isnull=True) | Q(category__is_published=False),
+        is_visible=True,
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_pub_date_idx',
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Публикация, её категория опубликованы и время публикации наступило.', verbose_name='Видна читателям'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['pub_date', 'id'], name='post_visible_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', 'pub_date', 'id'], name='post_category_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            hide_posts_without_published_category,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -1,6 +1,19 @@
+from datetime import datetime
+from hashlib import md5
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.shortcuts import redirect
+from django.core.cache import cache
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .cache import get_cached, get_version, make_key
+from .models import Post
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
 
 
 class AuthorReturnToPostMixin(UserPassesTestMixin):
@@ -20,3 +33,168 @@ class EditPostMixin(AuthorReturnToPostMixin):
 
     def handle_no_permission(self):
         return redirect('blog:post_detail', self.kwargs['post_pk'])
+
+
+class VisiblePostMixin:
+    post = None
+
+    def get_post(self):
+        if self.post is None:
+            post = get_object_or_404(
+                Post.objects.detail(), pk=self.kwargs['post_pk'])
+            if (
+                post.author_id != self.request.user.pk
+                and not post.is_public()
+            ):
+                raise Http404
+            self.post = post
+        return self.post
+
+
+class ConditionalGetMixin:
+    """Отдаёт `304 Not Modified` до построения контекста страницы.
+
+    Валидаторы должны быть дешёвыми: `ETag` строится из времени
+    изменения содержимого и частей, которые возвращает
+    `get_etag_parts()`, и зависит от пользователя и его csrf-cookie:
+    у гостя и автора разная разметка одной страницы.
+    """
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag_parts(self):
+        return ()
+
+    def get_etag(self, last_modified):
+        parts = (
+            self.request.user.pk,
+            self.request.META.get('CSRF_COOKIE'),
+            last_modified and last_modified.isoformat(),
+            *self.get_etag_parts(),
+        )
+        return quote_etag(md5(repr(parts).encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        last_modified = self.get_last_modified()
+        etag = self.get_etag(last_modified)
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        if timestamp:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(
+            response, no_cache=True,
+            private=request.user.is_authenticated,
+        )
+        return response
+
+
+class PostPageConditionalMixin(ConditionalGetMixin):
+
+    def get_last_modified(self):
+        return self.get_post().updated_at
+
+
+class PostListConditionalMixin(ConditionalGetMixin):
+    """Валидаторы лент — версия кэша `page`.
+
+    Она меняется при любом изменении, которое видно в лентах, включая
+    удаление и скрытие публикаций, и только растёт, поэтому годится
+    и для `Last-Modified`: максимум `updated_at` показанных публикаций
+    после удаления одной из них уменьшился бы. Версия хранится в общем
+    кэше, поэтому её видят изменения из любого процесса.
+    """
+
+    def get_last_modified(self):
+        return datetime.fromtimestamp(
+            get_version('page') / 1e9, timezone.utc
+        )
+
+
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+    paginator_template = 'includes/paginator.html'
+    cursor_paginator_template = 'includes/cursor_paginator.html'
+
+    def use_cursor_pagination(self):
+        return getattr(settings, 'BLOG_CURSOR_PAGINATION', False)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            paginator_template=(
+                self.cursor_paginator_template
+                if self.use_cursor_pagination()
+                else self.paginator_template
+            ),
+            **kwargs,
+        )
+
+
+class CachedCountMixin:
+    paginator_class = CachedCountPaginator
+
+    def get_count_key(self):
+        return None
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_key=self.get_count_key(), **kwargs
+        )
+
+
+class AnonymousPageCacheMixin:
+
+    def get_page_cache_timeout(self):
+        timeout = settings.BLOG_PAGE_CACHE_TIMEOUT
+        key = make_key('page', 'next_publication')
+        next_publication = cache.get(key)
+        if next_publication is None:
+            next_publication = Post.objects.next_publication() or False
+            cache.set(key, next_publication, timeout)
+        if next_publication:
+            seconds = (next_publication - timezone.now()).total_seconds()
+            timeout = min(timeout, max(int(seconds) + 1, 1))
+        return timeout
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            not settings.BLOG_PAGE_CACHE_TIMEOUT
+            or request.method != 'GET'
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        path = md5(request.get_full_path().encode()).hexdigest()
+        key = make_key('page', path)
+        response = get_cached('page', key)
+        if response is not None:
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified')
+                ),
+                response=response,
+            )
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response, self.get_page_cache_timeout()
+                )
+            )
+        return response
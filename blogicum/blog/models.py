@@ -1,8 +1,11 @@
+from time import time_ns
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils import timezone
 
-from .managers import PostQuerySet
+from .managers import CommentQuerySet, PostQuerySet
+from .storage import ContentHashStorage
 
 User = get_user_model()
 
@@ -63,7 +66,13 @@ class Post(PublishedModel):
             'можно делать отложенные публикации.'
         )
     )
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото', upload_to='post_images', blank=True,
+        storage=ContentHashStorage(),
+    )
+    image_variants = models.JSONField(
+        'Уменьшенные копии фото', default=dict, blank=True, editable=False
+    )
     author = models.ForeignKey(
         User,
         verbose_name='Автор публикации',
@@ -82,17 +91,121 @@ class Post(PublishedModel):
         on_delete=models.SET_NULL,
         null=True,
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+    card_version = models.BigIntegerField(
+        'Версия карточки', default=0, editable=False
+    )
+    is_visible = models.BooleanField(
+        'Видна читателям', default=False, editable=False,
+        help_text=(
+            'Публикация, её категория опубликованы и время публикации'
+            ' наступило.'
+        )
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
     objects = PostQuerySet.as_manager()
 
+    # Поля, которые ведут сигналы и воркеры через UPDATE; обычное
+    # сохранение их не пишет, чтобы не затереть свежие значения
+    # устаревшими из загруженного объекта. Фото пишется, только если
+    # его заменили: воркер переименовывает обработанный оригинал.
+    MAINTAINED_FIELDS = frozenset(('comment_count', 'image_variants'))
+    # Имя фото на момент загрузки из БД; None — поле отложено.
+    loaded_image_name = ''
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date', 'id'),
+                condition=models.Q(is_visible=True),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:DISPLAYED_TITLE_CHARACTERS_LIMIT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_image_name()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        if fields is None or 'image' in fields:
+            self.remember_image_name()
+
+    def get_stored_image_name(self):
+        if 'image' not in self.__dict__:
+            return None
+        image = self.__dict__['image']
+        return getattr(image, 'name', image) or ''
+
+    def remember_image_name(self):
+        self.loaded_image_name = self.get_stored_image_name()
+
+    def has_new_image(self):
+        image_name = self.get_stored_image_name()
+        return image_name is not None and image_name != self.loaded_image_name
+
+    def refresh_card_fields(self):
+        self.card_version = time_ns()
+        try:
+            category_is_published = (
+                self.category is not None and self.category.is_published
+            )
+        except Category.DoesNotExist:
+            # При loaddata категория может загрузиться позже публикации;
+            # тогда видимость обновит её сигнал post_save.
+            category_is_published = False
+        self.is_visible = (
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and category_is_published
+        )
+
+    def save(self, *args, **kwargs):
+        self.refresh_card_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and self.pk is not None and not (
+            self._state.adding or kwargs.get('force_insert')
+        ):
+            update_fields = self.get_regular_update_fields()
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'card_version', 'is_visible', 'updated_at'
+            }
+        super().save(*args, **kwargs)
+        self.remember_image_name()
+
+    def get_regular_update_fields(self):
+        deferred = self.get_deferred_fields()
+        if not self.has_new_image():
+            deferred.add('image')
+        return {
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname not in deferred
+        } - self.MAINTAINED_FIELDS
+
+    def is_public(self):
+        return self.is_visible
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -110,12 +223,56 @@ class Comment(models.Model):
         'Опубликовано',
         auto_now_add=True
     )
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return f'Comment by {self.author} at {self.created_at}'
+
+
+class ImageTask(models.Model):
+    PENDING = 'pending'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает обработки'),
+        (FAILED, 'Не удалось обработать'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Публикация',
+        on_delete=models.CASCADE,
+        related_name='image_tasks',
+    )
+    image_name = models.CharField('Файл фото', max_length=255)
+    status = models.CharField(
+        'Состояние', max_length=16, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    error = models.TextField('Последняя ошибка', blank=True)
+    run_after = models.DateTimeField(
+        'Не раньше', default=timezone.now, db_index=True
+    )
+    locked_until = models.DateTimeField(
+        'Занята воркером до', null=True, blank=True
+    )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('run_after',)
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
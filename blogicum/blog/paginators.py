@@ -0,0 +1,171 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import get_cached, make_key
+
+NEXT, PREVIOUS = 'n', 'p'
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def get_plan_rows(plan):
+    # psycopg2 разбирает столбец json сам, другие драйверы отдают строку.
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def estimate_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    # QuerySet.explain(format='json') в Django 3.2 склеивает строки
+    # результата через str(), и получается не JSON, а repr списка.
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        return get_plan_rows(cursor.fetchone()[0])
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который не считает число записей на каждый запрос.
+
+    Общее число записей считается по запросу без `select_related`
+    и сортировки и кэшируется под ключом `count_key` до следующего
+    изменения публикаций или категорий. Если оценка из статистики СУБД
+    больше `BLOG_PAGINATOR_ESTIMATE_THRESHOLD`, используется оценка.
+    """
+
+    def __init__(self, *args, count_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+
+    def get_count_queryset(self):
+        return self.object_list.select_related(None).order_by()
+
+    def compute_count(self):
+        queryset = self.get_count_queryset()
+        threshold = settings.BLOG_PAGINATOR_ESTIMATE_THRESHOLD
+        if threshold is not None:
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate > threshold:
+                return estimate
+        return queryset.count()
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return self.compute_count()
+        key = make_key('post_count', self.count_key)
+        count = get_cached('post_count', key)
+        if count is None:
+            count = self.compute_count()
+            cache.set(key, count, settings.BLOG_PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+
+class CursorPage:
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode_cursor(self.object_list[-1], NEXT)
+
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode_cursor(
+                self.object_list[0], PREVIOUS)
+
+
+class CursorPaginator:
+    """Пагинация по ключу `(поле, pk)` с непрозрачными курсорами.
+
+    В отличие от `Paginator` не выполняет `COUNT(*)` и `OFFSET`:
+    каждая страница — это диапазонный запрос от последней показанной
+    записи, поэтому время ответа не зависит от глубины.
+    """
+
+    def __init__(self, object_list, per_page, key_field='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key_field = key_field
+        self.descending = descending
+
+    def encode_cursor(self, obj, direction):
+        value = getattr(obj, self.key_field).isoformat()
+        raw = f'{direction}|{value}|{obj.pk}'.encode()
+        return urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, value, pk = raw.decode().split('|')
+            value, pk = parse_datetime(value), int(pk)
+        except (Base64Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor('Некорректный курсор.')
+        if direction not in (NEXT, PREVIOUS) or value is None:
+            raise InvalidCursor('Некорректный курсор.')
+        return direction, value, pk
+
+    def get_ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return f'{prefix}{self.key_field}', f'{prefix}pk'
+
+    def get_after_filter(self, value, pk, reverse=False):
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return Q(**{f'{self.key_field}__{lookup}e': value}) & (
+            Q(**{f'{self.key_field}__{lookup}': value})
+            | Q(**{self.key_field: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, cursor=None):
+        queryset = self.object_list
+        direction = NEXT
+        if cursor:
+            direction, value, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(self.get_after_filter(
+                value, pk, reverse=direction == PREVIOUS))
+        queryset = queryset.order_by(
+            *self.get_ordering(reverse=direction == PREVIOUS))
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if direction == PREVIOUS:
+            objects.reverse()
+            return CursorPage(objects, self, has_next=True,
+                              has_previous=has_more)
+        return CursorPage(objects, self, has_next=has_more,
+                          has_previous=bool(cursor))
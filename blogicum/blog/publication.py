@@ -0,0 +1,27 @@
+from django.core.cache import cache
+
+from .cache import bump_version
+from .clock import publication_cutoff
+from .models import Post
+
+
+def publish_due_posts(now=None):
+    published = Post.objects.filter(
+        is_published=True,
+        is_visible=False,
+        pub_date__lte=publication_cutoff(now),
+        category__is_published=True,
+    ).touch_cards(is_visible=True)
+    if published:
+        bump_version('post_count')
+        bump_version('page')
+    return published
+
+
+def publish_due_posts_once_per_tick(now=None):
+    # Раз за такт на все процессы — только с общим кэшем; с LocMemCache
+    # каждый процесс публикует сам. Повторный запуск безвреден.
+    key = f'blog:publication_tick:{publication_cutoff(now).timestamp()}'
+    if cache.add(key, True, 24 * 60 * 60):
+        return publish_due_posts(now)
+    return 0
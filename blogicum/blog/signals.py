@@ -0,0 +1,126 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_version
+from .image_queue import enqueue_image
+from .models import Category, Comment, Location, Post, User
+
+LOGIN_UPDATE_FIELDS = frozenset(('last_login',))
+
+
+@receiver(pre_save, sender=Post)
+def fill_raw_post_fields(sender, instance, raw, **kwargs):
+    # loaddata сохраняет объекты как есть, без auto_now и Post.save().
+    if not raw:
+        return
+    if instance.updated_at is None:
+        instance.updated_at = timezone.now()
+    instance.refresh_card_fields()
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, **kwargs):
+    counters = {'comment_count': F('comment_count') + 1} if created else {}
+    Post.objects.filter(pk=instance.post_id).touch_cards(**counters)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).touch_cards(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_processing(sender, instance, **kwargs):
+    # Копии и имя обработанного оригинала ведёт воркер; загруженный
+    # раньше объект может хранить их устаревшими, поэтому сравнивать
+    # их с фото нельзя — важно только, заменили ли фото.
+    if not instance.has_new_image():
+        return
+    variants = {}
+    if instance.image:
+        variants = {'name': instance.image.name, 'pending': True}
+        enqueue_image(instance)
+    Post.objects.filter(pk=instance.pk).touch_cards(image_variants=variants)
+    instance.image_variants = variants
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).refresh_visibility(
+        instance.is_published
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).refresh_visibility(False)
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_cards(sender, instance, **kwargs):
+    Post.objects.filter(location=instance).touch_cards()
+
+
+@receiver(pre_save, sender=User)
+def detect_username_change(sender, instance, raw, update_fields=None,
+                           **kwargs):
+    instance.username_changed = False
+    if raw or instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    stored = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    instance.username_changed = stored not in (None, instance.username)
+
+
+@receiver(post_save, sender=User)
+def touch_author_cards(sender, instance, created, **kwargs):
+    # Карточки показывают только имя пользователя автора и комментаторов.
+    if created or not getattr(instance, 'username_changed', False):
+        return
+    Post.objects.filter(author=instance).touch_cards()
+    Post.objects.filter(pk__in=Comment.objects.filter(
+        author=instance
+    ).values('post_id')).touch_cards()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_counts(sender, **kwargs):
+    bump_version('post_count')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    bump_version('category')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_authors(sender, update_fields=None, **kwargs):
+    if update_fields != LOGIN_UPDATE_FIELDS:
+        bump_version('author')
+        bump_version('page')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_pages(sender, **kwargs):
+    bump_version('page')
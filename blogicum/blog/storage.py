@@ -0,0 +1,44 @@
+import os
+from hashlib import sha256
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentHashStorage(FileSystemStorage):
+    """Хранилище, где имя файла — SHA-256 его содержимого.
+
+    Одинаковые загрузки получают одно имя и хранятся одним файлом
+    `<каталог>/<ab>/<sha256>.<расширение>`, где каталог — первая часть
+    предложенного имени. Файлы могут быть общими для нескольких
+    публикаций, поэтому неиспользуемые удаляет только команда
+    `collect_images`.
+    """
+
+    def get_content_name(self, name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        path = PurePosixPath(name)
+        root = path.parts[0] if len(path.parts) > 1 else ''
+        hexdigest = digest.hexdigest()
+        return str(PurePosixPath(
+            root, hexdigest[:2], hexdigest + path.suffix.lower()
+        ))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            # Свежая дата защищает файл от сборщика, пока запись
+            # публикации со ссылкой на него не сохранена.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
@@ -0,0 +1,50 @@
+from django import template
+from django.templatetags.static import static
+
+from blog.images import FALLBACK_FORMAT, FORMATS
+
+register = template.Library()
+
+POST_IMAGE_SIZES = '(max-width: 40rem) 100vw, 38rem'
+PLACEHOLDER = 'img/post_image_placeholder.svg'
+PLACEHOLDER_SIZE = (800, 600)
+
+
+def build_srcset(storage, sources):
+    return ', '.join(
+        f'{storage.url(name)} {width}w' for width, name in sources
+    )
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, css_class='', sizes=POST_IMAGE_SIZES):
+    variants = post.image_variants or {}
+    if variants.get('pending'):
+        width, height = PLACEHOLDER_SIZE
+        return {
+            'src': static(PLACEHOLDER),
+            'width': width,
+            'height': height,
+            'alt': 'Фото обрабатывается',
+            'css_class': css_class,
+        }
+    sources = dict(variants.get('sources', {}))
+    if variants.get('name') != post.image.name:
+        sources = {}
+    storage = post.image.storage
+    fallback = sources.pop(FORMATS[FALLBACK_FORMAT][1], None)
+    return {
+        'src': (
+            storage.url(fallback[-1][1]) if fallback else post.image.url
+        ),
+        'srcset': fallback and build_srcset(storage, fallback),
+        'sources': [
+            (mime_type, build_srcset(storage, mime_sources))
+            for mime_type, mime_sources in sources.items()
+        ],
+        'sizes': sizes,
+        'width': variants.get('width'),
+        'height': variants.get('height'),
+        'alt': post.title,
+        'css_class': css_class,
+    }
@@ -0,0 +1,87 @@
+import warnings
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from .images import get_dimensions_error, get_pixels_error
+
+# Сколько байт начала файла хранить, чтобы прочитать размеры
+# изображения: у JPEG перед ними может идти большой блок EXIF.
+HEADER_LIMIT = 256 * 1024
+
+
+class RejectedUpload(UploadedFile):
+    """Пустой файл на месте отклонённой загрузки.
+
+    Поле формы показывает `error` как ошибку формы вместо ответа 500
+    или обрыва соединения.
+    """
+
+    def __init__(self, name, content_type, error):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.error = error
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет файлы во временный файл по частям и проверяет лимиты.
+
+    Файл больше `POST_IMAGE_MAX_BYTES` перестаёт записываться с первой
+    лишней части. Размеры изображения читаются из заголовка, как только
+    он получен, поэтому «бомба» из небольшого файла с огромным числом
+    пикселей отклоняется до декодирования.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = bytearray()
+        self.error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error is not None:
+            return None
+        self.received += len(raw_data)
+        max_bytes = settings.POST_IMAGE_MAX_BYTES
+        if self.received > max_bytes:
+            return self.reject(
+                f'Файл больше {filesizeformat(max_bytes)}.'
+            )
+        if self.header is not None:
+            error = self.check_header(raw_data)
+            if error:
+                return self.reject(error)
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self, raw_data):
+        self.header += raw_data
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+            try:
+                with Image.open(BytesIO(self.header)) as image:
+                    size = image.size
+            except Image.DecompressionBombError:
+                self.header = None
+                return get_pixels_error()
+            except Exception:
+                if len(self.header) >= HEADER_LIMIT:
+                    self.header = None
+                return None
+        self.header = None
+        return get_dimensions_error(size)
+
+    def reject(self, error):
+        self.error = error
+        self.header = None
+        self.file.close()
+        return None
+
+    def file_complete(self, file_size):
+        if self.error is not None:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.error
+            )
+        return super().file_complete(file_size)
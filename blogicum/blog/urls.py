@@ -18,6 +18,10 @@ urlpatterns = [
         'posts/<int:post_pk>/',
         views.DetailPostView.as_view(),
         name='post_detail'),
+    path(
+        'posts/<int:post_pk>/comments/',
+        views.CommentListView.as_view(),
+        name='post_comments'),
     path(
         'posts/<int:post_pk>/comment/',
         views.AddCommentView.as_view(),
@@ -1,61 +1,104 @@
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.views.generic import (
-    ListView, DetailView, UpdateView, CreateView, DeleteView)
+    ListView, DetailView, UpdateView, CreateView, DeleteView, TemplateView)
 
-from .mixins import CommentAuthorMixin, EditPostMixin
+from .cache import get_cached_object_or_404
+from .mixins import (
+    AnonymousPageCacheMixin, CachedCountMixin, CommentAuthorMixin,
+    CursorPaginationMixin, EditPostMixin, PostListConditionalMixin,
+    PostPageConditionalMixin, VisiblePostMixin)
 from .forms import CommentForm, PostForm, ProfileForm
 from .models import Post, Category, Comment, User
+from .paginators import CursorPaginator, InvalidCursor
 
 
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 20
+# Поля автора для страницы профиля; объект кладётся в общий кэш,
+# поэтому хэш пароля и прочие поля в него не попадают.
+PROFILE_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
 
 
-class PostListView(ListView):
+class PostListView(
+        AnonymousPageCacheMixin, PostListConditionalMixin,
+        CursorPaginationMixin, CachedCountMixin, ListView):
     model = Post
     ordering = '-pub_date'
     template_name = 'blog/index.html'
     paginate_by = POSTS_ON_PAGE
 
     def get_queryset(self):
-        return super().get_queryset().published(
-        ).comment_count().modify_related_query()
+        return super().get_queryset().published().card()
 
+    def get_count_key(self):
+        return 'index'
 
-class DetailPostView(DetailView):
+
+def get_comments_page(post, cursor=None):
+    paginator = CursorPaginator(
+        post.comments.with_author(), COMMENTS_ON_PAGE,
+        key_field='created_at', descending=False,
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor as error:
+        raise Http404(str(error))
+
+
+class DetailPostView(VisiblePostMixin, PostPageConditionalMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
-    pk_url_kwarg = 'post_pk'
 
     def get_object(self):
-        post = get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
-        if post.author == self.request.user:
-            return post
-        return get_object_or_404(
-            Post.objects.published(),
-            pk=self.kwargs[self.pk_url_kwarg])
+        return self.get_post()
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             form=CommentForm(),
-            comments=self.object.comments.all(),
+            comments=get_comments_page(self.object),
+            **kwargs,
+        )
+
+
+class CommentListView(
+        VisiblePostMixin, PostPageConditionalMixin, TemplateView):
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        post = self.get_post()
+        return super().get_context_data(
+            post=post,
+            comments=get_comments_page(post, self.request.GET.get('cursor')),
             **kwargs,
         )
 
 
-class CategoryPostView(ListView):
+class CategoryPostView(
+        AnonymousPageCacheMixin, PostListConditionalMixin,
+        CursorPaginationMixin, CachedCountMixin, ListView):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = POSTS_ON_PAGE
+    category = None
 
     def get_category(self):
-        return get_object_or_404(Category, slug=self.kwargs['category_slug'],
-                                 is_published=True)
+        if self.category is None:
+            self.category = get_cached_object_or_404(
+                'category', Category.objects.filter(is_published=True),
+                slug=self.kwargs['category_slug'],
+            )
+        return self.category
 
     def get_queryset(self):
-        return self.get_category().posts.published(
-        ).comment_count().modify_related_query()
+        return self.get_category().posts.published().card()
+
+    def get_count_key(self):
+        return f'category:{self.kwargs["category_slug"]}'
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
@@ -64,21 +107,35 @@ class CategoryPostView(ListView):
         )
 
 
-class ProfileView(ListView):
+class ProfileView(
+        AnonymousPageCacheMixin, PostListConditionalMixin,
+        CursorPaginationMixin, CachedCountMixin, ListView):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = POSTS_ON_PAGE
+    author = None
 
     def get_author(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        if self.author is None:
+            self.author = get_cached_object_or_404(
+                'author', User.objects.only(*PROFILE_FIELDS),
+                username=self.kwargs['username'],
+            )
+        return self.author
+
+    def is_own_profile(self):
+        return self.get_author().pk == self.request.user.pk
 
     def get_queryset(self):
-        author = self.get_author()
-        posts = author.posts.comment_count().modify_related_query()
-        if author == self.request.user:
+        posts = self.get_author().posts.card()
+        if self.is_own_profile():
             return posts
         return posts.published()
 
+    def get_count_key(self):
+        scope = 'all' if self.is_own_profile() else 'published'
+        return f'profile:{self.get_author().pk}:{scope}'
+
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             profile=self.get_author(),
@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pages.middleware.MetricsMiddleware',
+    'pages.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,9 +57,87 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.PublicationClockMiddleware',
 ]
 
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
+# Кто передаёт файлы из MEDIA_ROOT: None — само приложение
+# (FileResponse с поддержкой Range), 'x-sendfile' — Apache или
+# lighttpd по полному пути, 'x-accel-redirect' — nginx через internal
+# location с префиксом MEDIA_ACCEL_REDIRECT_PREFIX.
+MEDIA_SENDFILE_BACKEND = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Время кэширования файлов, секунды: обычных и с хэшем содержимого
+# в имени, которые никогда не меняются.
+MEDIA_MAX_AGE = 3600
+MEDIA_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Ширины уменьшенных копий фото публикаций для srcset, пиксели.
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+# Форматы копий в порядке предпочтения; недоступные в Pillow
+# пропускаются, jpeg нужен как запасной вариант для <img>.
+POST_IMAGE_FORMATS = ('avif', 'webp', 'jpeg')
+POST_IMAGE_QUALITY = 80
+# Лимиты загружаемых фото: размер файла в байтах, сторона и площадь
+# в пикселях. Проверяются при приёме файла, до декодирования.
+POST_IMAGE_MAX_BYTES = 20 * 1024 * 1024
+POST_IMAGE_MAX_SIDE = 12_000
+POST_IMAGE_MAX_PIXELS = 50_000_000
+FILE_UPLOAD_HANDLERS = ['blog.uploads.LimitedUploadHandler']
+# Очередь обработки фото (`manage.py process_images`): сколько секунд
+# воркер держит задачу, сколько раз повторяет её при сбое и базовая
+# пауза перед повтором (удваивается с каждой попыткой).
+IMAGE_TASK_LEASE = 300
+IMAGE_TASK_MAX_ATTEMPTS = 5
+IMAGE_TASK_RETRY_DELAY = 30
+
+# Допустимое число запросов к БД на один ответ по имени представления;
+# превышения и повторяющиеся запросы пишутся в лог `blogicum.queries`.
+QUERY_BUDGETS = {
+    'blog:index': 4,
+    'blog:category_posts': 5,
+    'blog:profile': 6,
+    'blog:post_detail': 5,
+    'blog:post_comments': 5,
+}
+QUERY_BUDGET_DEFAULT = 10
+# Допустимый рост метрик `manage.py benchmark_views --baseline`
+# относительно базового результата, доля.
+BENCHMARK_THRESHOLDS = {
+    'p50_ms': 0.25,
+    'p95_ms': 0.5,
+    'queries': 0,
+    'bytes': 0.1,
+}
+
+# Каталог, через который процессы (воркеры gunicorn) делятся метриками
+# для /pages/metrics/; None — метрики только текущего процесса.
+METRICS_MULTIPROCESS_DIR = None
+# Как часто процесс сбрасывает свои метрики в каталог, секунды.
+METRICS_FLUSH_INTERVAL = 1
+
+# Keyset-пагинация (?cursor=) вместо постраничной (?page=) в лентах.
+BLOG_CURSOR_PAGINATION = False
+# Время жизни закэшированного числа публикаций в ленте, секунды.
+BLOG_PAGINATOR_COUNT_TIMEOUT = 60
+# Начиная с этого числа записей пагинатор берёт оценку из статистики
+# СУБД вместо точного COUNT(*); None — всегда считать точно.
+BLOG_PAGINATOR_ESTIMATE_THRESHOLD = 100_000
+# Время жизни закэшированных категорий и авторов страниц, секунды.
+BLOG_LOOKUP_CACHE_TIMEOUT = 30
+# Время жизни закэшированных страниц лент для анонимных посетителей,
+# секунды; 0 отключает кэш.
+BLOG_PAGE_CACHE_TIMEOUT = 300
+# Время жизни закэшированных карточек публикаций, секунды; ключ
+# включает card_version, поэтому изменения видны сразу.
+BLOG_POST_CARD_CACHE_TIMEOUT = 24 * 3600
+# Шаг часов публикации, секунды: отложенные публикации открываются
+# на ближайшем такте после наступления pub_date.
+BLOG_PUBLICATION_CLOCK_GRANULARITY = 60
+# Открывать отложенные публикации из обработки запросов (не чаще раза
+# за такт). Отключите, если запущен `manage.py publish_scheduled --loop`.
+BLOG_PUBLICATION_INLINE_SCHEDULER = True
 
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -94,6 +174,20 @@ DATABASES = {
 }
 
 
+# Кэш должен быть общим для всех процессов: веб-воркеров,
+# `publish_scheduled` и `process_images`. В нём лежат версии, которые
+# сбрасывают кэш лент и меняют их ETag; у LocMemCache они свои в каждом
+# процессе. Файловый кэш общий в пределах сервера, для нескольких
+# серверов нужен Redis или Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -13,13 +13,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from urllib.parse import urlsplit
+
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic import CreateView
 
+from pages.media import MediaView
+
 
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
@@ -35,7 +38,14 @@ urlpatterns = [
         name='registration',
     ),
     path('admin/', admin.site.urls),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if not urlsplit(settings.MEDIA_URL).netloc:
+    urlpatterns.append(path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>',
+        MediaView.as_view(),
+        name='media',
+    ))
 
 handler404 = 'pages.views.page_not_found'
 handler403 = 'pages.views.csrf_failure'
@@ -5,3 +5,9 @@ class PagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pages'
     verbose_name = 'Pages Admin'
+
+    def ready(self):
+        from blog.cache import cache_accessed
+
+        from .metrics import record_cache_access
+        cache_accessed.connect(record_cache_access)
@@ -0,0 +1,68 @@
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+
+class QueryCollector:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        return {
+            sql: count for (sql, _), count in self.statements.items()
+            if count > 1
+        }
+
+    @contextmanager
+    def collect(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+def get_query_budget(view_name):
+    return settings.QUERY_BUDGETS.get(
+        view_name, settings.QUERY_BUDGET_DEFAULT
+    )
+
+
+@contextmanager
+def assert_query_budget(view_name=None, queries=None,
+                        allow_duplicates=False):
+    """Проверяет, что блок укладывается в бюджет запросов к БД.
+
+    Бюджет задаётся явно (`queries`) или берётся из `QUERY_BUDGETS`
+    по имени представления, например `blog:index`.
+    """
+    budget = queries if queries is not None else get_query_budget(view_name)
+    with QueryCollector().collect() as collector:
+        yield collector
+    assert collector.count <= budget, (
+        f'{view_name or "Блок"} выполнил {collector.count} запросов к БД'
+        f' при бюджете {budget}.'
+    )
+    assert allow_duplicates or not collector.duplicates, (
+        f'{view_name or "Блок"} повторяет запросы: {collector.duplicates}'
+    )
@@ -0,0 +1,162 @@
+import mimetypes
+import os
+import re
+from hashlib import sha256
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.generic import View
+
+HASH_LENGTH = 12
+HASHED_NAME = re.compile(rf'\.[0-9a-f]{{{HASH_LENGTH}}}(\.[^./]+)$')
+# Имена из blog.storage.ContentHashStorage — полный SHA-256.
+CONTENT_NAME = re.compile(r'(?:^|/)[0-9a-f]{64}\.[^./]+$')
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def hashed_name(name, content):
+    """Добавляет к имени файла начало SHA-256 его содержимого."""
+    path = PurePosixPath(name)
+    digest = sha256(content).hexdigest()[:HASH_LENGTH]
+    return str(path.with_name(f'{path.stem}.{digest}{path.suffix}'))
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME.search(name) or CONTENT_NAME.search(name))
+
+
+def strip_hash(name):
+    return HASHED_NAME.sub(r'\1', name)
+
+
+def parse_range(header, size):
+    """Возвращает `(начало, длина)` единственного диапазона байт.
+
+    `None` — заголовка нет или диапазонов несколько: отдаётся весь
+    файл; `ValueError` — диапазон за пределами файла.
+    """
+    match = BYTE_RANGE.match(header or '')
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end - start + 1
+
+
+class FileRange:
+    """Часть открытого файла для потоковой отдачи ответа 206."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class MediaView(View):
+    """Отдаёт загруженные файлы из `MEDIA_ROOT`.
+
+    С `MEDIA_SENDFILE_BACKEND` передачу файла берёт на себя веб-сервер
+    (`X-Sendfile` у Apache и lighttpd, `X-Accel-Redirect` у nginx),
+    иначе файл отдаёт `FileResponse`: через `wsgi.file_wrapper`, то есть
+    `sendfile()` у gunicorn, с поддержкой `Range`. Файлы с хэшем
+    содержимого в имени кэшируются навсегда (`immutable`).
+    """
+
+    def get(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+            stat = os.stat(full_path)
+        except (SuspiciousFileOperation, OSError):
+            raise Http404
+        if not os.path.isfile(full_path):
+            raise Http404
+        etag = quote_etag(f'{stat.st_size:x}-{stat.st_mtime_ns:x}')
+        last_modified = int(stat.st_mtime)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_file_response(
+                request, path, full_path, stat.st_size, etag
+            )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        self.set_cache_control(response, path)
+        return response
+
+    def head(self, request, path):
+        return self.get(request, path)
+
+    def set_cache_control(self, response, path):
+        if is_hashed_name(path):
+            patch_cache_control(
+                response, public=True, immutable=True,
+                max_age=settings.MEDIA_IMMUTABLE_MAX_AGE,
+            )
+        else:
+            patch_cache_control(
+                response, public=True, max_age=settings.MEDIA_MAX_AGE
+            )
+
+    def get_file_response(self, request, path, full_path, size, etag):
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+        backend = settings.MEDIA_SENDFILE_BACKEND
+        if backend:
+            response = HttpResponse(content_type=content_type)
+            if backend == 'x-accel-redirect':
+                response['X-Accel-Redirect'] = (
+                    settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+                )
+            else:
+                response['X-Sendfile'] = full_path
+            return response
+        byte_range = None
+        if request.headers.get('If-Range', etag) == etag:
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+        file = open(full_path, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, length = byte_range
+            response = FileResponse(
+                FileRange(file, start, length),
+                content_type=content_type, status=206,
+            )
+            response['Content-Length'] = length
+            response['Content-Range'] = (
+                f'bytes {start}-{start + length - 1}/{size}'
+            )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Accept-Ranges'] = 'bytes'
+        return response
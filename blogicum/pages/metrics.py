@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from time import monotonic
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class MetricsRegistry:
+    """Счётчики и гистограммы в текстовом формате Prometheus.
+
+    Каждый процесс копит значения в памяти. Если задан
+    `METRICS_MULTIPROCESS_DIR`, процесс периодически сбрасывает их в свой
+    файл `<pid>.json`, а `expose()` суммирует файлы всех процессов —
+    так метрики gunicorn-воркеров не теряются между запросами.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.help = {}
+        self.types = {}
+        self.buckets = {}
+        self.values = defaultdict(float)
+        self.last_flush = 0.0
+
+    def register(self, name, kind, help_text, buckets=None):
+        self.types[name] = kind
+        self.help[name] = help_text
+        if buckets:
+            self.buckets[name] = tuple(buckets)
+
+    def inc(self, name, labels=None, amount=1):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            self.values[key] += amount
+        self.maybe_flush()
+
+    def observe(self, name, value, labels=None):
+        labels = tuple(sorted((labels or {}).items()))
+        with self.lock:
+            for bound in self.buckets[name]:
+                if value <= bound:
+                    self.values[(f'{name}_bucket', labels + (
+                        ('le', str(bound)),))] += 1
+            self.values[(f'{name}_bucket', labels + (('le', '+Inf'),))] += 1
+            self.values[(f'{name}_sum', labels)] += value
+            self.values[(f'{name}_count', labels)] += 1
+        self.maybe_flush()
+
+    def get_directory(self):
+        directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+        return Path(directory) if directory else None
+
+    def maybe_flush(self, force=False):
+        directory = self.get_directory()
+        if directory is None:
+            return
+        with self.flush_lock:
+            now = monotonic()
+            interval = settings.METRICS_FLUSH_INTERVAL
+            if not force and now - self.last_flush < interval:
+                return
+            self.last_flush = now
+            with self.lock:
+                data = [[name, labels, value]
+                        for (name, labels), value in self.values.items()]
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f'{os.getpid()}.json'
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(data))
+            os.replace(temporary, path)
+
+    def collect(self):
+        directory = self.get_directory()
+        if directory is None:
+            with self.lock:
+                return dict(self.values)
+        self.maybe_flush(force=True)
+        values = defaultdict(float)
+        for path in directory.glob('*.json'):
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data:
+                values[(name, tuple(map(tuple, labels)))] += value
+        return values
+
+    def expose(self):
+        values = self.collect()
+        lines = []
+        for name in sorted(self.types):
+            lines.append(f'# HELP {name} {self.help[name]}')
+            lines.append(f'# TYPE {name} {self.types[name]}')
+            samples = sorted(
+                (key, value) for key, value in values.items()
+                if key[0] == name or (
+                    key[0].startswith(f'{name}_')
+                    and key[0][len(name) + 1:] in ('bucket', 'sum', 'count')
+                )
+            )
+            for (sample, labels), value in samples:
+                label_text = ','.join(
+                    f'{label}="{escape(label_value)}"'
+                    for label, label_value in labels
+                )
+                if label_text:
+                    sample = f'{sample}{{{label_text}}}'
+                lines.append(f'{sample} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_value(value):
+    # repr() даёт кратчайшую запись без потери точности, в отличие от
+    # `:g`, который округляет до шести значащих цифр.
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('\n', r'\n')
+        .replace('"', r'\"')
+    )
+
+
+def record_cache_access(sender, namespace, hit, **kwargs):
+    registry.inc(
+        'cache_requests_total',
+        {'namespace': namespace, 'result': 'hit' if hit else 'miss'},
+    )
+
+
+registry = MetricsRegistry()
+registry.register(
+    'http_request_duration_seconds', 'histogram',
+    'Время обработки запроса по имени URL.', buckets=DEFAULT_BUCKETS,
+)
+registry.register(
+    'http_responses_total', 'counter',
+    'Ответы по имени URL и коду статуса.',
+)
+registry.register(
+    'http_error_pages_total', 'counter',
+    'Ответы обработчиков ошибок 404 и 500.',
+)
+registry.register(
+    'db_queries_total', 'counter', 'Запросы к БД по имени URL.',
+)
+registry.register(
+    'db_query_duration_seconds_total', 'counter',
+    'Суммарное время запросов к БД по имени URL.',
+)
+registry.register(
+    'cache_requests_total', 'counter',
+    'Обращения к кэшу по пространству ключей и результату.',
+)
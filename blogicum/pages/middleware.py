@@ -0,0 +1,85 @@
+import logging
+from time import perf_counter
+
+from django.conf import settings
+
+from .instrumentation import QueryCollector, get_query_budget
+from .metrics import registry
+
+logger = logging.getLogger('blogicum.queries')
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.render_duration = 0.0
+        start = perf_counter()
+        with QueryCollector().collect() as collector:
+            request.query_collector = collector
+            response = self.get_response(request)
+        total = perf_counter() - start
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        self.check_budget(request, view_name, collector)
+        if settings.DEBUG:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={collector.duration * 1000:.1f}'
+                f';desc="{collector.count} queries"',
+                f'render;dur={request.render_duration * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ))
+        return response
+
+    def process_template_response(self, request, response):
+        start = perf_counter()
+
+        def record_render_duration(response):
+            request.render_duration = perf_counter() - start
+
+        response.add_post_render_callback(record_render_duration)
+        return response
+
+    def check_budget(self, request, view_name, collector):
+        budget = get_query_budget(view_name)
+        if budget is not None and collector.count > budget:
+            logger.warning(
+                '%s %s (%s): %d queries, budget %d',
+                request.method, request.path, view_name,
+                collector.count, budget,
+            )
+        if collector.duplicates:
+            logger.warning(
+                '%s %s (%s): duplicate queries %s',
+                request.method, request.path, view_name,
+                collector.duplicates,
+            )
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = perf_counter()
+        response = self.get_response(request)
+        duration = perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        registry.observe(
+            'http_request_duration_seconds', duration,
+            {'view': view, 'method': request.method},
+        )
+        registry.inc(
+            'http_responses_total',
+            {'view': view, 'status': str(response.status_code)},
+        )
+        collector = getattr(request, 'query_collector', None)
+        if collector is not None:
+            registry.inc('db_queries_total', {'view': view}, collector.count)
+            registry.inc(
+                'db_query_duration_seconds_total', {'view': view},
+                collector.duration,
+            )
+        return response
@@ -7,4 +7,5 @@ app_name = 'pages'
 urlpatterns = [
     path('about/', views.AboutView.as_view(), name='about'),
     path('rules/', views.RulesView.as_view(), name='rules'),
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
 ]
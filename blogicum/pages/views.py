@@ -1,6 +1,11 @@
-from django.views.generic import TemplateView
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.generic import TemplateView, View
 from django.shortcuts import render
 
+from .metrics import registry
+
 
 class AboutView(TemplateView):
     template_name = 'pages/about.html'
@@ -11,6 +16,7 @@ class RulesView(TemplateView):
 
 
 def page_not_found(request, exception):
+    registry.inc('http_error_pages_total', {'handler': 'page_not_found'})
     return render(request, 'pages/404.html', status=404)
 
 
@@ -19,4 +25,14 @@ def csrf_failure(request, reason='', exception=None):
 
 
 def server_error(request):
+    registry.inc('http_error_pages_total', {'handler': 'server_error'})
     return render(request, 'pages/500.html', status=500)
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class MetricsView(View):
+
+    def get(self, request):
+        return HttpResponse(
+            registry.expose(), content_type='text/plain; version=0.0.4'
+        )
@@ -2,6 +2,7 @@ import os
 import re
 import time
 from http import HTTPStatus
+from io import BytesIO
 from inspect import getsource
 from pathlib import Path
 from typing import (
@@ -18,13 +19,16 @@ from typing import (
 
 import pytest
 from django.apps import apps
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
 from mixer.backend.django import mixer as _mixer
+from PIL import Image
 
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
@@ -41,6 +45,18 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def disable_inline_publication(settings):
+    settings.BLOG_PUBLICATION_INLINE_SCHEDULER = False
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -347,6 +363,26 @@ def get_field_key(field_type: type, field: Field) -> Tuple[str, Optional[str]]:
         return (field_type.__name__, None)
 
 
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_image(
+    size=(2000, 1000), name=None, exif=None, color="teal", mode="RGB",
+    image_format="JPEG",
+):
+    data = BytesIO()
+    options = {"exif": exif} if exif else {}
+    Image.new(mode, size, color).save(data, image_format, **options)
+    extension = "jpg" if image_format == "JPEG" else image_format.lower()
+    return SimpleUploadedFile(
+        name or f"photo.{extension}", data.getvalue(),
+        f"image/{image_format.lower()}",
+    )
+
+
 @pytest.fixture(scope="session", autouse=True)
 def cleanup(request):
     start_time = time.time()
@@ -363,7 +399,13 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
+                    or filename.endswith(".avif")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+
+    for root, dirs, files in os.walk(image_dir, topdown=False):
+        if root != str(image_dir) and not os.listdir(root):
+            os.rmdir(root)
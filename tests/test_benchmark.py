@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+SCENARIOS = (
+    "index", "category", "profile", "post_detail", "add_comment",
+    "create_post",
+)
+
+
+@pytest.fixture
+def seeded_blog():
+    call_command(
+        "seed_blog", users=3, categories=2, locations=2, posts=15,
+        comments=20, unpublished_share=0, future_share=0,
+    )
+
+
+def test_benchmark_writes_report_and_rolls_back(seeded_blog, tmp_path):
+    output = tmp_path / "benchmark.json"
+    call_command("benchmark_views", requests=2, warmup=0, output=output)
+    report = json.loads(output.read_text())
+    assert set(report["scenarios"]) == set(SCENARIOS)
+    for result in report["scenarios"].values():
+        assert result["p50_ms"] <= result["p95_ms"]
+        assert result["queries"] > 0
+    assert report["scenarios"]["index"]["bytes"] > 0
+    assert Post.objects.count() == 15 and Comment.objects.count() == 20, (
+        "Убедитесь, что публикации и комментарии, созданные при замерах,"
+        " не остаются в базе."
+    )
+
+
+def test_benchmark_fails_on_regression(seeded_blog, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    call_command("benchmark_views", requests=2, warmup=0, output=baseline)
+    report = json.loads(baseline.read_text())
+    report["scenarios"]["index"]["queries"] -= 1
+    baseline.write_text(json.dumps(report))
+    with pytest.raises(CommandError, match="index queries"):
+        call_command(
+            "benchmark_views", requests=2, warmup=0, baseline=baseline,
+            threshold=100,
+        )
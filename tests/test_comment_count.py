@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+    mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при добавлении комментария увеличивается"
+        " счётчик комментариев публикации."
+    )
+    comments[0].delete()
+    comments[1].author.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария, в том числе каскадном,"
+        " уменьшается счётчик комментариев публикации."
+    )
+
+
+def test_recount_comments_repairs_counts(
+    mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("recount_comments", batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_saving_stale_post_keeps_comment_count(
+    mixer: Mixer, post_with_published_location
+):
+    post = type(post_with_published_location).objects.get(
+        pk=post_with_published_location.pk
+    )
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert (post.title, post.comment_count) == ("Новый заголовок", 2), (
+        "Убедитесь, что сохранение публикации не затирает счётчик"
+        " комментариев, который ведут сигналы."
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_recount_comments_refreshes_cards(
+    mixer: Mixer, post_with_published_location, client
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+    assert "(7)" in client.get("/").content.decode("utf-8")
+    untouched = mixer.blend(
+        "blog.Post", author=post.author, category=post.category
+    )
+    untouched.refresh_from_db()
+    stdout = StringIO()
+    call_command("recount_comments", stdout=stdout)
+    assert "Исправлено счётчиков: 1" in stdout.getvalue()
+    assert type(post).objects.get(pk=untouched.pk).card_version == (
+        untouched.card_version
+    )
+    content = client.get("/").content.decode("utf-8")
+    assert "(7)" not in content and "(1)" in content, (
+        "Убедитесь, что после пересчёта комментариев карточка публикации"
+        " показывает исправленное число."
+    )
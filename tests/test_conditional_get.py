@@ -0,0 +1,151 @@
+from http import HTTPStatus
+from time import time_ns
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+from blog.cache import VERSION_KEY
+from blog.checks import check_shared_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_post_detail_not_modified(
+    mixer: Mixer, post_with_published_location, client
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    )
+    not_modified = revalidate(client, url, response)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что страница публикации отвечает `304 Not Modified`,"
+        " если публикация и комментарии к ней не менялись."
+    )
+    assert not not_modified.content and not not_modified.templates
+    by_date = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert by_date.status_code == HTTPStatus.NOT_MODIFIED
+
+    comment = mixer.blend("blog.Comment", post=post_with_published_location)
+    after_comment = revalidate(client, url, response)
+    assert after_comment.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после добавления комментария страница публикации"
+        " отдаётся заново."
+    )
+    comment.text = "Исправленный комментарий"
+    comment.save()
+    assert revalidate(client, url, after_comment).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_etag_depends_on_user(
+    post_with_published_location, client, user_client
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    anonymous = client.get(url)
+    assert anonymous["ETag"] != user_client.get(url)["ETag"]
+    assert revalidate(user_client, url, anonymous).status_code == (
+        HTTPStatus.OK
+    ), "Убедитесь, что ETag страницы зависит от пользователя."
+
+
+@pytest.mark.parametrize("page_cache_timeout", [0, 300])
+def test_feed_not_modified_until_new_post(
+    mixer: Mixer, post_with_published_location, client, page_cache_timeout
+):
+    post = post_with_published_location
+    with override_settings(BLOG_PAGE_CACHE_TIMEOUT=page_cache_timeout):
+        response = client.get("/")
+        assert revalidate(client, "/", response).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        ), (
+            "Убедитесь, что лента отвечает `304 Not Modified`, если"
+            " публикации не менялись."
+        )
+        mixer.blend(
+            "blog.Post", author=post.author, category=post.category,
+            location=post.location,
+        )
+        assert revalidate(client, "/", response).status_code == (
+            HTTPStatus.OK
+        ), "Убедитесь, что после новой публикации лента отдаётся заново."
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_feed_last_modified_moves_forward_on_delete(
+    mixer: Mixer, post_with_published_location, client
+):
+    post = post_with_published_location
+    newest = mixer.blend(
+        "blog.Post", author=post.author, category=post.category,
+        location=post.location,
+    )
+    # Лента получена раньше, чем удалена публикация: If-Modified-Since
+    # различает только целые секунды.
+    cache.set(VERSION_KEY.format(namespace="page"), time_ns() - 10 ** 10)
+    response = client.get("/")
+    newest.delete()
+    by_date = client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert by_date.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после удаления публикации лента не отвечает"
+        " `304 Not Modified` на запрос с `If-Modified-Since`."
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_not_modified_skips_page_queries(
+    mixer: Mixer, post_with_published_location, client,
+    django_assert_max_num_queries
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    for url, max_queries in (("/", 0), (f"/posts/{post.id}/", 1)):
+        response = client.get(url)
+        with django_assert_max_num_queries(max_queries):
+            not_modified = revalidate(client, url, response)
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+            "Убедитесь, что ответ `304 Not Modified` не требует запросов"
+            " ленты, комментариев и счётчиков."
+        )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_feed_etag_follows_other_processes(
+    post_with_published_location, client, settings
+):
+    response = client.get("/")
+    # Отдельный объект кэша — как в другом процессе: общий у них только
+    # каталог файлового кэша.
+    other_process = FileBasedCache(
+        str(settings.CACHES["default"]["LOCATION"]), {}
+    )
+    other_process.set(VERSION_KEY.format(namespace="page"), time_ns(), None)
+    assert revalidate(client, "/", response).status_code == HTTPStatus.OK, (
+        "Убедитесь, что изменения из других процессов меняют ETag ленты:"
+        " версии кэша должны храниться в общем кэше."
+    )
+
+
+def test_process_local_cache_is_reported(settings):
+    assert not check_shared_cache(None)
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+    assert [message.id for message in check_shared_cache(None)] == [
+        "blog.W001"
+    ]
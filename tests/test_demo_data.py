@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+DEMO_DATA = settings.BASE_DIR.parent / "db.json"
+
+
+def test_demo_data_loads():
+    call_command("loaddata", str(DEMO_DATA), verbosity=0)
+    fixture_posts = [
+        item for item in json.loads(DEMO_DATA.read_text())
+        if item["model"] == "blog.post"
+    ]
+    assert Post.objects.count() == len(fixture_posts)
+    assert not Post.objects.filter(updated_at__isnull=True).exists(), (
+        "Убедитесь, что демонстрационные данные из `db.json` загружаются"
+        " командой loaddata и получают время изменения."
+    )
+
+
+def test_demo_data_posts_are_visible():
+    call_command("loaddata", str(DEMO_DATA), verbosity=0)
+    expected = Post.objects.filter(
+        is_published=True, pub_date__lte=timezone.now(),
+        category__is_published=True,
+    )
+    assert expected.exists()
+    assert set(Post.objects.published()) == set(expected), (
+        "Убедитесь, что видимость публикаций вычисляется и при загрузке"
+        " данных командой loaddata."
+    )
+    assert not Post.objects.filter(card_version=0).exists()
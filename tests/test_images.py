@@ -0,0 +1,163 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.image_queue import process_image_tasks
+from blog.models import ImageTask
+from conftest import make_image
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+def save_image(post, image):
+    post.image = image
+    post.save()
+    process_image_tasks()
+    post.refresh_from_db()
+
+
+def test_variants_are_generated_and_rendered(
+    mixer: Mixer, post_with_published_location, client, media_root
+):
+    post = post_with_published_location
+    save_image(post, make_image())
+    variants = post.image_variants
+    assert (variants["width"], variants["height"]) == (2000, 1000)
+    jpeg = variants["sources"]["image/jpeg"]
+    assert [width for width, _ in jpeg] == [320, 640, 1280]
+    assert all((media_root / name).exists() for _, name in jpeg), (
+        "Убедитесь, что уменьшенные копии фото сохраняются рядом"
+        " с оригиналом."
+    )
+    assert Image.open(media_root / jpeg[0][1]).size == (320, 160)
+    for url in ("/", f"/posts/{post.id}/"):
+        content = client.get(url).content.decode("utf-8")
+        assert 'srcset="' in content and 'sizes="' in content
+        assert 'width="2000" height="1000"' in content
+        assert 'loading="lazy"' in content
+        assert '<source type="image/webp"' in content, (
+            f"Убедитесь, что страница `{url}` предлагает браузеру"
+            " копии фото в формате WebP."
+        )
+        assert f'src="{post.image.url}"' not in content
+
+
+def test_replaced_image_drops_old_variants(
+    post_with_published_location, media_root
+):
+    post = post_with_published_location
+    save_image(post, make_image())
+    old_names = [
+        name for sources in post.image_variants["sources"].values()
+        for _, name in sources
+    ]
+    save_image(post, make_image((300, 200), "small.jpg"))
+    call_command("collect_images", min_age=0)
+    assert not any((media_root / name).exists() for name in old_names)
+    widths = [width for width, _ in post.image_variants["sources"][
+        "image/jpeg"]]
+    assert widths == [300], (
+        "Убедитесь, что копии фото не бывают шире оригинала."
+    )
+
+
+def test_unreadable_image_falls_back_to_original(
+    post_with_published_location, client
+):
+    post = post_with_published_location
+    save_image(post, SimpleUploadedFile("broken.jpg", b"not an image"))
+    assert post.image_variants == {"name": post.image.name, "sources": {}}
+    assert ImageTask.objects.get().status == ImageTask.FAILED
+    content = client.get("/").content.decode("utf-8")
+    assert f'src="{post.image.url}"' in content
+
+
+def test_placeholder_until_image_is_processed(
+    post_with_published_location, client
+):
+    post = post_with_published_location
+    post.image = make_image()
+    post.save()
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "post_image_placeholder.svg" in content, (
+        "Убедитесь, что до обработки фото публикация показывает заглушку."
+    )
+    assert process_image_tasks() == 1
+    assert not ImageTask.objects.exists()
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "post_image_placeholder.svg" not in content
+
+
+def test_stale_post_save_keeps_processed_image(
+    post_with_published_location, client
+):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    post = post_with_published_location
+    # Оригинал с EXIF воркер пересохраняет под другим именем.
+    post.image = make_image(exif=exif.tobytes())
+    post.save()
+    stale = type(post).objects.get(pk=post.pk)
+    assert stale.image_variants.get("pending")
+    process_image_tasks()
+    stale.title = "Новый заголовок"
+    stale.save()
+    post.refresh_from_db()
+    assert post.title == "Новый заголовок"
+    assert "pending" not in post.image_variants, (
+        "Убедитесь, что сохранение публикации, загруженной до обработки"
+        " фото, не возвращает заглушку вместо готовых копий."
+    )
+    assert post.image.name == post.image_variants["name"] != (
+        stale.loaded_image_name
+    )
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "post_image_placeholder.svg" not in content
+
+
+def test_exif_is_stripped_and_orientation_applied(
+    post_with_published_location, media_root
+):
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x8825] = {2: (55.0, 45.0, 0.0)}
+    post = post_with_published_location
+    post.image = make_image((200, 100), "rotated.jpg", exif.tobytes())
+    post.save()
+    uploaded_name = post.image.name
+    process_image_tasks()
+    post.refresh_from_db()
+    assert post.image.name != uploaded_name
+    call_command("collect_images", min_age=0)
+    assert not (media_root / uploaded_name).exists()
+    original = Image.open(media_root / post.image.name)
+    assert original.size == (100, 200)
+    assert not original.getexif(), (
+        "Убедитесь, что из загруженного фото удаляются метаданные EXIF."
+    )
+    assert post.image_variants["width"] == 100
+
+
+def test_process_images_requires_shared_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+    with pytest.raises(CommandError):
+        call_command("process_images")
+
+
+def test_form_rejects_non_image_without_decoding(
+    user_client, published_category
+):
+    response = user_client.post("/posts/create/", data={
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2024-01-01 10:00",
+        "category": published_category.id,
+        "image": SimpleUploadedFile("fake.jpg", b"not an image"),
+    })
+    assert "image" in response.context["form"].errors
@@ -0,0 +1,53 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from pages.instrumentation import assert_query_budget
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(DEBUG=True)
+def test_server_timing_header(post_with_published_location, client):
+    response = client.get(f"/posts/{post_with_published_location.id}/")
+    timing = response["Server-Timing"]
+    assert 'desc="2 queries"' in timing
+    assert "render;dur=" in timing and "total;dur=" in timing
+
+
+def test_no_server_timing_header_without_debug(client):
+    assert "Server-Timing" not in client.get("/")
+
+
+def test_budget_violation_is_logged(
+    post_with_published_location, client, caplog
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    with override_settings(QUERY_BUDGETS={"blog:post_detail": 1}):
+        with caplog.at_level(logging.WARNING, logger="blogicum.queries"):
+            client.get(url)
+    assert "blog:post_detail" in caplog.text
+    assert "2 queries, budget 1" in caplog.text
+
+
+def test_list_views_fit_query_budgets(
+    post_with_published_location, user_client
+):
+    post = post_with_published_location
+    for view_name, url in (
+        ("blog:index", "/"),
+        ("blog:category_posts", f"/category/{post.category.slug}/"),
+        ("blog:profile", f"/profile/{post.author.username}/"),
+        ("blog:post_detail", f"/posts/{post.id}/"),
+    ):
+        with assert_query_budget(view_name):
+            user_client.get(url)
+
+
+def test_assert_query_budget_detects_duplicates(post_with_published_location):
+    Post = type(post_with_published_location)
+    with pytest.raises(AssertionError, match="повторяет запросы"):
+        with assert_query_budget(queries=5):
+            Post.objects.get(pk=post_with_published_location.pk)
+            Post.objects.get(pk=post_with_published_location.pk)
@@ -0,0 +1,75 @@
+import asyncio
+
+from blog.loadtest import Connection, LoadTest
+
+TARGETS = {"posts": [1, 2], "categories": ["travel"], "authors": ["author"]}
+
+
+async def handle_client(reader, writer):
+    while True:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            break
+        path = head.split()[1]
+        if path.startswith(b"/chunked"):
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n"
+                b"Set-Cookie: sessionid=abc; Path=/\r\n\r\n"
+                b"3\r\nfoo\r\n3\r\nbar\r\n0\r\n\r\n"
+            )
+        elif path.startswith(b"/posts/2/"):
+            writer.write(b"HTTP/1.1 500 Error\r\nContent-Length: 0\r\n\r\n")
+        else:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+                b"Set-Cookie: sessionid=; Max-Age=0; Path=/\r\n\r\nok"
+            )
+        await writer.drain()
+    writer.close()
+
+
+async def serve(coroutine):
+    server = await asyncio.start_server(handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await coroutine(port)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_connection_reads_chunked_and_keeps_cookies():
+    async def requests(port):
+        connection = Connection("127.0.0.1", port, timeout=5)
+        chunked = await connection.request("GET", "/chunked/")
+        cookies = dict(connection.cookies)
+        plain = await connection.request("GET", "/")
+        connection.close()
+        return chunked, cookies, plain, connection.cookies
+
+    chunked, cookies, plain, cookies_after = asyncio.run(serve(requests))
+    assert chunked.body == b"foobar"
+    assert cookies == {"sessionid": "abc"}
+    assert plain.body == b"ok"
+    assert cookies_after == {}, (
+        "Убедитесь, что cookie с Max-Age=0 удаляется из сессии посетителя."
+    )
+
+
+def test_load_test_reports_throughput_and_errors():
+    async def load(port):
+        return await LoadTest(
+            "127.0.0.1", port, TARGETS, usernames=[], password="",
+            rps=100, duration=0.3, mix={"feed": 1, "detail": 1}, seed=1,
+        ).run()
+
+    report = asyncio.run(serve(load))
+    assert report["scenarios_total"] == 30
+    assert set(report["scenarios"]) == {"feed", "detail"}
+    assert report["scenarios"]["feed"]["error_rate"] == 0
+    detail = report["scenarios"]["detail"]
+    assert 0 < detail["errors"].get("HTTP 500", 0) < detail["count"], (
+        "Убедитесь, что ответы с ошибкой учитываются в доле ошибок."
+    )
+    assert report["throughput_rps"] > 0
@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+
+from pages.media import hashed_name, is_hashed_name
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def serve_from_app(settings):
+    settings.MEDIA_SENDFILE_BACKEND = None
+
+
+@pytest.fixture
+def media_file(media_root):
+    name = hashed_name("post_images/photo.jpg", CONTENT)
+    (media_root / "post_images").mkdir()
+    (media_root / name).write_bytes(CONTENT)
+    return name
+
+
+def test_hashed_file_is_cached_forever(client, media_file):
+    assert is_hashed_name(media_file)
+    response = client.get(f"/media/{media_file}")
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Accept-Ranges"] == "bytes"
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    )
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хэшем содержимого в имени отдаются"
+        " с `Cache-Control: immutable`."
+    )
+    not_modified = client.get(
+        f"/media/{media_file}", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_plain_file_is_cached_briefly(client, media_root, settings):
+    (media_root / "photo.jpg").write_bytes(CONTENT)
+    response = client.get("/media/photo.jpg")
+    assert response.status_code == HTTPStatus.OK
+    assert "immutable" not in response["Cache-Control"]
+    assert f"max-age={settings.MEDIA_MAX_AGE}" in response["Cache-Control"]
+
+
+def test_range_request(client, media_file):
+    response = client.get(f"/media/{media_file}", HTTP_RANGE="bytes=10-19")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        "Убедитесь, что медиафайлы поддерживают запросы с `Range`."
+    )
+    assert b"".join(response.streaming_content) == CONTENT[10:20]
+    assert response["Content-Length"] == "10"
+    assert response["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    suffix = client.get(f"/media/{media_file}", HTTP_RANGE="bytes=-5")
+    assert b"".join(suffix.streaming_content) == CONTENT[-5:]
+
+    outdated = client.get(
+        f"/media/{media_file}", HTTP_RANGE="bytes=10-19",
+        HTTP_IF_RANGE='"outdated"',
+    )
+    assert outdated.status_code == HTTPStatus.OK
+
+    unsatisfiable = client.get(
+        f"/media/{media_file}", HTTP_RANGE=f"bytes={len(CONTENT)}-"
+    )
+    assert unsatisfiable.status_code == (
+        HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    )
+    assert unsatisfiable["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_missing_and_outside_files(client, media_root):
+    (media_root.parent / "secret.txt").write_text("secret")
+    for url in ("/media/missing.jpg", "/media/../secret.txt",
+                "/media/%2e%2e/secret.txt", "/media/"):
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            "Убедитесь, что отдаются только существующие файлы"
+            " из `MEDIA_ROOT`."
+        )
+
+
+@pytest.mark.parametrize(
+    "backend, header",
+    [("x-accel-redirect", "X-Accel-Redirect"), ("x-sendfile", "X-Sendfile")],
+)
+def test_sendfile_backends(client, media_file, settings, backend, header):
+    settings.MEDIA_SENDFILE_BACKEND = backend
+    response = client.get(f"/media/{media_file}")
+    assert response.status_code == HTTPStatus.OK
+    assert not response.content, (
+        "Убедитесь, что при `MEDIA_SENDFILE_BACKEND` файл передаёт"
+        " веб-сервер, а не приложение."
+    )
+    assert response[header].endswith(media_file)
+    assert response["Content-Type"] == "image/jpeg"
+    assert "immutable" in response["Cache-Control"]
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client
+
+from pages.metrics import MetricsRegistry
+
+pytestmark = [pytest.mark.django_db]
+
+METRICS_URL = "/pages/metrics/"
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(
+        username="metrics_admin", is_staff=True
+    )
+    client = Client()
+    client.force_login(staff)
+    return client
+
+
+def test_metrics_require_staff(user_client, unlogged_client):
+    assert unlogged_client.get(METRICS_URL).status_code == HTTPStatus.FOUND
+    assert user_client.get(METRICS_URL).status_code == HTTPStatus.FOUND
+
+
+def test_metrics_exposition(
+    post_with_published_location, unlogged_client, staff_client
+):
+    unlogged_client.get("/")
+    unlogged_client.get("/")
+    unlogged_client.get("/posts/0/")
+    content = staff_client.get(METRICS_URL).content.decode("utf-8")
+    assert "# TYPE http_request_duration_seconds histogram" in content
+    assert (
+        'http_request_duration_seconds_count{method="GET",view="blog:index"}'
+        in content
+    )
+    assert 'http_responses_total{status="404",view="blog:post_detail"}' in (
+        content
+    )
+    assert 'http_error_pages_total{handler="page_not_found"}' in content
+    assert 'db_queries_total{view="blog:index"}' in content
+    assert 'cache_requests_total{namespace="page",result="hit"}' in content
+
+
+def test_multiprocess_aggregation(tmp_path, settings):
+    settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+    settings.METRICS_FLUSH_INTERVAL = 0
+    (tmp_path / "1.json").write_text(
+        '[["http_responses_total", [["status", "200"]], 3]]'
+    )
+    registry = MetricsRegistry()
+    registry.register("http_responses_total", "counter", "Ответы.")
+    registry.inc("http_responses_total", {"status": "200"}, 2)
+    assert 'http_responses_total{status="200"} 5' in registry.expose()
+
+
+def test_large_values_keep_precision():
+    registry = MetricsRegistry()
+    registry.register("http_responses_total", "counter", "Ответы.")
+    registry.inc("http_responses_total", {"status": "200"}, 1234567)
+    registry.inc("http_responses_total", {"status": "500"}, 0.5)
+    registry.inc("http_responses_total", {"status": "500"}, 1234567)
+    content = registry.expose()
+    assert 'http_responses_total{status="200"} 1234567\n' in content, (
+        "Убедитесь, что большие значения счётчиков выводятся без"
+        " округления."
+    )
+    assert 'http_responses_total{status="500"} 1234567.5\n' in content
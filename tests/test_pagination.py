@@ -0,0 +1,134 @@
+import json
+import re
+
+import pytest
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+from blog import paginators
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def collect_pages(client, response, cursor_method):
+    pages = []
+    while True:
+        page = response.context["page_obj"]
+        pages.append([post.id for post in page])
+        cursor = getattr(page, cursor_method)()
+        if cursor is None:
+            return pages
+        response = client.get("/", {"cursor": cursor})
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True, BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_cursor_pagination(many_posts, client):
+    expected = [
+        post.id for post in
+        sorted(many_posts, key=lambda p: (p.pub_date, p.id), reverse=True)
+    ]
+    pages = collect_pages(client, client.get("/"), "next_cursor")
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 3]
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что при keyset-пагинации публикации не повторяются"
+        " и не пропускаются."
+    )
+    response = client.get("/")
+    for _ in range(len(pages) - 1):
+        cursor = response.context["page_obj"].next_cursor()
+        response = client.get("/", {"cursor": cursor})
+    assert "?page=" not in response.content.decode("utf-8")
+    backwards = collect_pages(client, response, "previous_cursor")
+    assert backwards[::-1] == pages
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_invalid_cursor_returns_404(client):
+    assert client.get("/", {"cursor": "not-a-cursor"}).status_code == 404
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_post_count_is_cached_until_posts_change(
+    many_posts, mixer: Mixer, user, published_category, client,
+    django_assert_num_queries
+):
+    client.get("/")
+    with django_assert_num_queries(1):
+        response = client.get("/")
+    assert response.context["paginator"].count == len(many_posts), (
+        "Убедитесь, что число публикаций берётся из кэша без повторного"
+        " запроса COUNT."
+    )
+    mixer.blend("blog.Post", author=user, category=published_category)
+    with django_assert_num_queries(2):
+        response = client.get("/")
+    assert response.context["paginator"].count == len(many_posts) + 1
+
+
+@pytest.mark.parametrize("number", [1, 5000, 20000])
+def test_paginator_renders_bounded_window(number):
+    page_obj = Paginator(range(200000), N_PER_PAGE).page(number)
+    content = render_to_string(
+        "includes/paginator.html", {"page_obj": page_obj}
+    )
+    page_links = re.findall(r'href="\?page=(\d+)"', content)
+    assert len(page_links) <= 12, (
+        "Убедитесь, что в пагинаторе выводятся ссылки только на соседние"
+        " страницы, а не на все страницы ленты."
+    )
+    assert f'<span class="page-link">{number}</span>' in content
+
+
+class FakeCursor:
+
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return (self.row,)
+
+
+class FakeConnection:
+    vendor = "postgresql"
+
+    def __init__(self, row):
+        self.fake_cursor = FakeCursor(row)
+
+    def cursor(self):
+        return self.fake_cursor
+
+
+@pytest.mark.parametrize("as_text", [False, True])
+def test_estimate_count_reads_json_plan(monkeypatch, as_text):
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 123456}}]
+    connection = FakeConnection(json.dumps(plan) if as_text else plan)
+    monkeypatch.setattr(paginators, "connections", {"default": connection})
+    queryset = Post.objects.published().order_by()
+    assert paginators.estimate_count(queryset) == 123456, (
+        "Убедитесь, что оценка числа записей читается из плана"
+        " `EXPLAIN (FORMAT JSON)`."
+    )
+    (sql, _), = connection.fake_cursor.executed
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "is_visible" in sql
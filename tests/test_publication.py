@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.clock import publication_cutoff
+from blog.publication import publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_publication_cutoff_is_quantized(settings):
+    settings.BLOG_PUBLICATION_CLOCK_GRANULARITY = 60
+    now = timezone.now().replace(second=42, microsecond=123)
+    assert publication_cutoff(now) == now.replace(second=0, microsecond=0)
+    assert publication_cutoff(now) == publication_cutoff(
+        now + timedelta(seconds=10)
+    )
+
+
+def test_scheduled_post_is_published_on_next_tick(
+    mixer: Mixer, user, published_category, client, settings
+):
+    settings.BLOG_PUBLICATION_CLOCK_GRANULARITY = 60
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    assert not post.is_visible
+    assert f"/posts/{post.id}/" not in client.get("/").content.decode()
+
+    assert publish_due_posts() == 0
+    assert publish_due_posts(
+        now=post.pub_date + timedelta(minutes=1)
+    ) == 1
+    post.refresh_from_db()
+    assert post.is_visible
+    assert f"/posts/{post.id}/" in client.get("/").content.decode(), (
+        "Убедитесь, что после наступления времени публикации запись"
+        " появляется в ленте, несмотря на кэш страниц."
+    )
+
+
+def test_publish_scheduled_command(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(minutes=2),
+    )
+    type(post).objects.filter(pk=post.pk).update(is_visible=False)
+    call_command("publish_scheduled")
+    post.refresh_from_db()
+    assert post.is_visible
+
+
+def test_publish_scheduled_requires_shared_cache(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+    with pytest.raises(CommandError):
+        call_command("publish_scheduled")
+
+
+def test_category_publication_updates_post_visibility(
+    mixer: Mixer, user, published_category
+):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    future_post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    Post = type(future_post)
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.filter(is_visible=True).exists(), (
+        "Убедитесь, что при снятии категории с публикации её записи"
+        " скрываются от читателей."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert set(Post.objects.published()) == set(posts)
+
+    published_category.is_published = False
+    published_category.save()
+    assert publish_due_posts(now=future_post.pub_date + timedelta(1)) == 0
@@ -0,0 +1,263 @@
+import re
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.mixins import AnonymousPageCacheMixin
+from blog.views import COMMENTS_ON_PAGE
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS_PER_POST = 5
+
+
+@pytest.fixture
+def commented_posts(
+    mixer: Mixer, user: Model, published_category, published_location
+):
+    posts = mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    for post in posts:
+        mixer.cycle(N_COMMENTS_PER_POST).blend("blog.Comment", post=post)
+    return posts
+
+
+def list_page_urls(posts):
+    post = posts[0]
+    return (
+        ("/", 2),
+        (f"/category/{post.category.slug}/", 3),
+        (f"/profile/{post.author.username}/", 3),
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_list_pages_do_not_load_comments(
+    commented_posts, client, django_assert_num_queries
+):
+    for url, expected_queries in list_page_urls(commented_posts):
+        with django_assert_num_queries(expected_queries) as ctx:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        comment_selects = [
+            query["sql"] for query in ctx.captured_queries
+            if query["sql"].startswith('SELECT "blog_comment"')
+        ]
+        assert not comment_selects, (
+            f"Убедитесь, что страница `{url}` не загружает комментарии"
+            " к публикациям, а только их количество."
+        )
+        page_posts = response.context["page_obj"].object_list
+        assert len(page_posts) == N_PER_PAGE
+        assert all(
+            post.comment_count == N_COMMENTS_PER_POST for post in page_posts
+        )
+        content = response.content.decode("utf-8")
+        assert f"({N_COMMENTS_PER_POST})" in content
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_repeated_list_pages_reuse_cached_lookups(
+    commented_posts, client, django_assert_num_queries
+):
+    for url, _ in list_page_urls(commented_posts):
+        client.get(url)
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что повторный запрос страницы `{url}` берёт"
+            " категорию, автора и число публикаций из кэша."
+        )
+
+
+def test_anonymous_list_pages_are_cached(
+    commented_posts, mixer: Mixer, client, django_assert_num_queries
+):
+    for url, _ in list_page_urls(commented_posts):
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что страница `{url}` для анонимных посетителей"
+            " отдаётся из кэша."
+        )
+    mixer.blend("blog.Comment", post=commented_posts[-1])
+    content = client.get("/").content.decode("utf-8")
+    assert f"({N_COMMENTS_PER_POST + 1})" in content, (
+        "Убедитесь, что кэш страниц сбрасывается при добавлении комментария."
+    )
+
+
+def test_scheduled_post_limits_page_cache_timeout(
+    mixer: Mixer, user, published_category
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert AnonymousPageCacheMixin().get_page_cache_timeout() <= 31
+
+
+def test_own_profile_queries(
+    commented_posts, user, user_client, django_assert_num_queries
+):
+    url = f"/profile/{user.username}/"
+    # session, user, profile author, post count, page of posts
+    with django_assert_num_queries(5):
+        response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_cached_profile_author_has_no_password(
+    commented_posts, user, client
+):
+    response = client.get(f"/profile/{user.username}/")
+    profile = response.context["profile"]
+    assert "password" in profile.get_deferred_fields(), (
+        "Убедитесь, что в кэш страницы профиля не попадает хэш пароля"
+        " автора."
+    )
+    assert profile.username == user.username
+
+
+def test_unpublished_category_is_not_served_from_cache(
+    commented_posts, client
+):
+    category = commented_posts[0].category
+    url = f"/category/{category.slug}/"
+    assert client.get(url).status_code == HTTPStatus.OK
+    category.is_published = False
+    category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_post_detail_is_loaded_with_one_query(
+    post_with_published_location, client, django_assert_num_queries
+):
+    post = post_with_published_location
+    # post with author, location and category; comments
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что публикация, её автор, местоположение и категория"
+        " загружаются одним запросом."
+    )
+
+
+@pytest.mark.parametrize("n_comments", [1, 20])
+def test_post_detail_queries_do_not_depend_on_comments(
+    mixer: Mixer, post_with_published_location, client, n_comments,
+    django_assert_num_queries
+):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    content = response.content.decode("utf-8")
+    assert content.count('name="comment_') == n_comments, (
+        "Убедитесь, что комментарии и их авторы загружаются одним"
+        " запросом независимо от числа комментариев."
+    )
+
+
+def test_comments_are_paginated(
+    mixer: Mixer, post_with_published_location, client
+):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_ON_PAGE + 5).blend(
+        "blog.Comment", post=post
+    )
+    response = client.get(f"/posts/{post.id}/")
+    content = response.content.decode("utf-8")
+    assert content.count('name="comment_') == COMMENTS_ON_PAGE
+    next_url = re.search(
+        r'href="(/posts/\d+/comments/\?cursor=[\w-]+)"', content
+    )
+    assert next_url, (
+        "Убедитесь, что на странице публикации есть ссылка на следующую"
+        " порцию комментариев."
+    )
+    fragment = client.get(next_url.group(1)).content.decode("utf-8")
+    assert "<html" not in fragment
+    shown_ids = re.findall(r'name="comment_(\d+)"', content + fragment)
+    assert shown_ids == [str(comment.id) for comment in comments]
+    assert "cursor=" not in fragment
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_post_cards_are_rerendered_after_changes(
+    commented_posts, mixer: Mixer, client
+):
+    post = commented_posts[-1]
+    client.get("/")
+    post.category.title = "Обновлённая категория"
+    post.category.save()
+    post.author.username = "renamed_author"
+    post.author.save()
+    mixer.blend("blog.Comment", post=post)
+    content = client.get("/").content.decode("utf-8")
+    assert "Обновлённая категория" in content
+    assert "@renamed_author" in content
+    assert f"({N_COMMENTS_PER_POST + 1})" in content, (
+        "Убедитесь, что закэшированная карточка публикации обновляется"
+        " при изменении категории, автора или числа комментариев."
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0, BLOG_POST_CARD_CACHE_TIMEOUT=0)
+def test_post_card_cache_timeout_setting(commented_posts, client):
+    post = commented_posts[-1]
+    client.get("/")
+    # update() не меняет card_version, карточку обновит только истечение
+    # времени жизни фрагмента.
+    type(post).objects.filter(pk=post.pk).update(title="Без кэша")
+    assert "Без кэша" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что время жизни кэша карточек берётся из настройки"
+        " `BLOG_POST_CARD_CACHE_TIMEOUT`."
+    )
+
+
+def test_author_cards_are_touched_only_on_rename(
+    mixer: Mixer, user, another_user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    commented = mixer.blend(
+        "blog.Post", author=another_user, category=published_category
+    )
+    mixer.blend("blog.Comment", post=commented, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        get_user_model().objects.create_user("new_reader", password="x")
+        user.set_password("new-password")
+        user.save()
+    assert not [
+        query for query in queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ], (
+        "Убедитесь, что регистрация и смена пароля не обновляют карточки"
+        " публикаций."
+    )
+    versions = {
+        pk: version for pk, version in type(post).objects.values_list(
+            "pk", "card_version"
+        )
+    }
+    user.username = "renamed_author"
+    user.save()
+    for pk, version in type(post).objects.values_list("pk", "card_version"):
+        assert version != versions[pk], (
+            "Убедитесь, что при смене имени пользователя обновляются"
+            " карточки его публикаций и публикаций с его комментариями."
+        )
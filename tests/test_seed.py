@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+SEED_OPTIONS = dict(
+    users=3, categories=2, locations=2, posts=20, comments=30, batch_size=7
+)
+
+
+def test_seed_blog_creates_consistent_data():
+    call_command("seed_blog", **SEED_OPTIONS)
+    assert Post.objects.count() == 20
+    assert Comment.objects.count() == 30
+    counted = Post.objects.annotate(real_count=Count("comments"))
+    assert all(
+        post.comment_count == post.real_count for post in counted
+    ), (
+        "Убедитесь, что команда `seed_blog` заполняет счётчик комментариев"
+        " публикаций."
+    )
+    now = timezone.now()
+    for post in Post.objects.select_related("category"):
+        assert post.is_visible == (
+            post.is_published and post.category.is_published
+            and post.pub_date <= now
+        ), "Убедитесь, что команда `seed_blog` заполняет флаг видимости."
+
+
+def test_seed_blog_is_deterministic_and_refuses_duplicates():
+    call_command("seed_blog", **SEED_OPTIONS)
+    first = list(Post.objects.order_by("pk").values_list("title", "text"))
+    with pytest.raises(CommandError):
+        call_command("seed_blog", **SEED_OPTIONS)
+    call_command("seed_blog", prefix="again", **SEED_OPTIONS)
+    second = list(
+        Post.objects.order_by("pk").values_list("title", "text")[20:]
+    )
+    assert first == second, (
+        "Убедитесь, что одинаковое зерно генератора даёт одинаковые данные."
+    )
@@ -0,0 +1,87 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.image_queue import process_image_tasks
+from blog.models import Post
+from conftest import make_image
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+@pytest.fixture(autouse=True)
+def jpeg_variants_only(settings):
+    settings.POST_IMAGE_FORMATS = ("jpeg",)
+
+
+def stored_files(media_root):
+    return {
+        path.relative_to(media_root).as_posix()
+        for path in media_root.rglob("*") if path.is_file()
+    }
+
+
+def collect(**options):
+    stdout = StringIO()
+    call_command("collect_images", stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+def test_identical_uploads_share_one_file(
+    mixer: Mixer, post_with_published_location, media_root
+):
+    first = post_with_published_location
+    second = mixer.blend(
+        "blog.Post", author=first.author, category=first.category,
+        location=first.location, image="",
+    )
+    existing = stored_files(media_root)
+    first.image = make_image(name="one.jpg")
+    first.save()
+    second.image = make_image(name="two.JPG")
+    second.save()
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые загрузки хранятся одним файлом."
+    )
+    assert first.image.name.endswith(".jpg")
+    process_image_tasks()
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.image_variants == second.image_variants
+    assert len(stored_files(media_root) - existing) == len(
+        first.image_variants["sources"]["image/jpeg"]
+    ) + 1
+
+
+def test_collector_removes_only_unreferenced_files(
+    post_with_published_location, media_root
+):
+    post = post_with_published_location
+    post.image = make_image()
+    post.save()
+    process_image_tasks()
+    post.refresh_from_db()
+    kept = stored_files(media_root)
+    orphan = post.image.storage.save("post_images/old.jpg", make_image(
+        color="red"
+    ))
+    assert "Удалено файлов: 0" in collect(), (
+        "Убедитесь, что недавно сохранённые файлы не удаляются:"
+        " ссылка на них может появиться позже."
+    )
+    old = os.path.getmtime(media_root / orphan) - 7200
+    os.utime(media_root / orphan, (old, old))
+    assert "Будет удалено файлов: 1" in collect(dry_run=True)
+    assert (media_root / orphan).exists()
+    collect(batch_size=1)
+    assert stored_files(media_root) == kept, (
+        "Убедитесь, что `collect_images` удаляет файлы без ссылок"
+        " и не трогает фото публикаций и их копии."
+    )
+
+    Post.objects.filter(pk=post.pk).delete()
+    collect(min_age=0)
+    assert not stored_files(media_root)
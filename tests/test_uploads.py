@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from blog.models import Post
+from conftest import make_image
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+def create_post(client, category, image):
+    return client.post("/posts/create/", data={
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2024-01-01 10:00",
+        "category": category.id,
+        "image": image,
+    })
+
+
+@override_settings(POST_IMAGE_MAX_BYTES=10_000)
+def test_oversized_upload_is_a_form_error(user_client, published_category):
+    image = SimpleUploadedFile("big.jpg", b"\xff" * 50_000)
+    response = create_post(user_client, published_category, image)
+    assert response.status_code == HTTPStatus.OK
+    errors = response.context["form"].errors
+    assert "Файл больше" in errors["image"][0], (
+        "Убедитесь, что слишком большой файл отклоняется с ошибкой формы."
+    )
+    assert not Post.objects.exists()
+
+
+@override_settings(POST_IMAGE_MAX_PIXELS=1_000_000)
+def test_decompression_bomb_is_rejected_by_header(
+    user_client, published_category
+):
+    image = make_image((4000, 4000), mode="1", image_format="PNG")
+    assert image.size < 100_000
+    response = create_post(user_client, published_category, image)
+    errors = response.context["form"].errors
+    assert "мегапикселей" in errors["image"][0], (
+        "Убедитесь, что изображение с огромным числом пикселей отклоняется"
+        " по заголовку, до декодирования."
+    )
+
+
+@override_settings(POST_IMAGE_MAX_SIDE=500)
+def test_image_side_is_limited(user_client, published_category):
+    response = create_post(
+        user_client, published_category,
+        make_image((600, 10), image_format="PNG"),
+    )
+    assert "image" in response.context["form"].errors
+
+
+def test_image_within_limits_is_accepted(user_client, published_category):
+    response = create_post(
+        user_client, published_category,
+        make_image((300, 200)),
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert Post.objects.get().image